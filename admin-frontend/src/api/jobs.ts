@@ -2,10 +2,11 @@
  * Automation Jobs API
  */
 import { apiGet, apiPost } from './client';
-import { AutomationJob } from '../types';
+import { AutomationJob, CursorPage } from '../types';
 
 export async function fetchJobs(): Promise<AutomationJob[]> {
-  return apiGet<AutomationJob[]>('/automation/jobs/');
+  const page = await apiGet<CursorPage<AutomationJob>>('/automation/jobs/');
+  return page.results;
 }
 
 export async function triggerScrape(): Promise<{ job_id: number; status: string }> {
@@ -2,12 +2,20 @@
  * Products API
  */
 import { apiGet, apiPost, apiPut, apiDelete } from './client';
-import { Product } from '../types';
+import { Product, ProductChangeFeed } from '../types';
 
 export async function fetchProducts(): Promise<Product[]> {
   return apiGet<Product[]>('/products/');
 }
 
+/**
+ * Products created, updated or deleted after sequence number `since`.
+ * Pass the returned `next` as `since` on the following call.
+ */
+export async function fetchProductChanges(since: number): Promise<ProductChangeFeed> {
+  return apiGet<ProductChangeFeed>(`/products/changes/?since=${since}`);
+}
+
 export async function createProduct(payload: Partial<Product>): Promise<Product> {
   return apiPost<Product>('/products/', payload);
 }
@@ -10,7 +10,11 @@ export interface Product {
   url: string;
   rating: number | null;
   image_url: string | null;
+  image_hash: string;
+  cached_image_url: string | null;
+  thumbnail_url: string | null;
   source_url: string | null;
+  source: string;
   last_synced_at: string | null;
   last_updated: string | null;
 }
@@ -19,11 +23,34 @@ export interface AutomationJob {
   id: number;
   job_type: string;
   status: 'queued' | 'running' | 'completed' | 'failed' | string;
+  progress: number;
   created_at: string;
+  updated_at: string;
   finished_at: string | null;
   error_message: string | null;
 }
 
+export interface ProductChange {
+  seq: number;
+  action: 'created' | 'updated' | 'deleted';
+  product_id: number;
+  product: Product | null;
+}
+
+export interface ProductChangeFeed {
+  since: number;
+  next: number;
+  has_more: boolean;
+  latest: number;
+  changes: ProductChange[];
+}
+
+export interface CursorPage<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}
+
 export interface InsightStats {
   count: number;
   avgPrice: number | null;
@@ -1,24 +1,56 @@
 from django.contrib import admin
+from .admin_utils import ChoicesListFilter, KeysetPaginatedAdmin
 from .models import Product, AutomationJob
 
 
+class RatingListFilter(ChoicesListFilter):
+    title = 'rating'
+    parameter_name = 'rating'
+    choices_list = [(rating, str(rating)) for rating in range(6)]
+
+
+class StockListFilter(ChoicesListFilter):
+    title = 'stock'
+    parameter_name = 'stock'
+    choices_list = [(1, 'In stock'), (0, 'Out of stock')]
+
+    def queryset(self, request, queryset):
+        # stock is a count, any positive number is in stock
+        if self.value() == '1':
+            return queryset.filter(stock__gt=0)
+        if self.value() == '0':
+            return queryset.filter(stock=0)
+        return queryset
+
+
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(KeysetPaginatedAdmin):
     """
     Admin interface for Product model.
+
+    Built for millions of rows: estimated counts, keyset paging over
+    (last_updated, id), filters on indexed columns with fixed choices and
+    an index-backed name prefix search.
     """
     list_display = ['name', 'price', 'stock', 'rating', 'last_updated']
-    list_filter = ['rating', 'stock', 'last_updated']
-    search_fields = ['name']
+    list_filter = [RatingListFilter, StockListFilter, 'last_updated']
+    search_fields = ['^name']
+    search_help_text = 'Products whose name starts with the search text'
     readonly_fields = ['last_updated']
+    keyset_ordering = ('-last_updated', '-id')
 
 
 @admin.register(AutomationJob)
-class AutomationJobAdmin(admin.ModelAdmin):
+class AutomationJobAdmin(KeysetPaginatedAdmin):
     """
     Admin interface for AutomationJob model.
+
+    Same large-table changelist as ProductAdmin, paged over (created_at, id);
+    error messages are searched through the full-text index.
     """
     list_display = ['id', 'job_type', 'status', 'created_at', 'finished_at']
     list_filter = ['job_type', 'status', 'created_at']
     readonly_fields = ['created_at', 'finished_at']
-    search_fields = ['job_type', 'error_message']
+    search_fields = ['=job_type', '@error_message']
+    search_help_text = 'Exact job type, or words (or word prefixes) in the error message'
+    keyset_ordering = ('-created_at', '-id')
@@ -0,0 +1,211 @@
+"""
+Admin changelist pieces for tables too large for the stock changelist.
+
+The stock changelist runs an exact COUNT(*) (twice), pages with OFFSET and
+builds some filters from SELECT DISTINCT scans. KeysetPaginatedAdmin instead:
+
+- counts unfiltered tables from the database's table statistics and caps
+  filtered counts at settings.ADMIN_EXACT_COUNT_LIMIT rows
+- pages with a keyset cursor over `keyset_ordering`, which must be backed by
+  an index and only contain non-null fields
+- only allows sorting by that ordering
+"""
+import base64
+import json
+from typing import List, Optional
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+CURSOR_VAR = 'cursor'
+
+
+def estimate_row_count(model, using: str) -> Optional[int]:
+    """
+    Row count of the model's table from the database statistics, or None
+    when the backend keeps none (SQLite) or the table was never analyzed.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                [table],
+            )
+        elif connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+        else:
+            return None
+        row = cursor.fetchone()
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator whose count never scans a large table.
+
+    Unfiltered querysets use the table statistics once they are above
+    settings.ADMIN_ESTIMATED_COUNT_THRESHOLD rows; other querysets are
+    counted exactly up to settings.ADMIN_EXACT_COUNT_LIMIT rows.
+    """
+    count_is_estimate = False
+    count_is_capped = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimate_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+                self.count_is_estimate = True
+                return estimate
+
+        limit = settings.ADMIN_EXACT_COUNT_LIMIT
+        # COUNT over a LIMITed subquery stops scanning after `limit` rows
+        count = queryset.order_by()[:limit].count()
+        self.count_is_capped = count >= limit
+        return count
+
+
+def encode_cursor(values: List) -> str:
+    raw = json.dumps(values).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> List:
+    raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+    values = json.loads(raw)
+    if not isinstance(values, list):
+        raise ValueError("Cursor must encode a list")
+    return values
+
+
+class KeysetChangeList(ChangeList):
+    """
+    ChangeList paging with `?cursor=` (the last row of the previous page)
+    instead of `?p=`. Falls back to the stock pages when sorted by hand.
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        # get_results() runs inside ChangeList.__init__
+        self.cursor = request.GET.get(CURSOR_VAR)
+        self.next_cursor = None
+        self.keyset = False
+        super().__init__(request, *args, **kwargs)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Changing filters, search or sorting starts again from the first page
+        return super().get_query_string(new_params, [CURSOR_VAR, *(remove or [])])
+
+    @property
+    def next_page_url(self) -> Optional[str]:
+        return self.get_query_string({CURSOR_VAR: self.next_cursor}) if self.next_cursor else None
+
+    @property
+    def keyset_fields(self):
+        return [
+            (field.lstrip('-'), field.startswith('-'))
+            for field in self.model_admin.keyset_ordering
+        ]
+
+    def _get_field(self, name: str):
+        return self.opts.pk if name == 'pk' else self.opts.get_field(name)
+
+    def _keyset_filter(self, values: List) -> Q:
+        """
+        Rows strictly after `values` in keyset order:
+        (a < x) OR (a = x AND b < y) OR ... for descending fields.
+        """
+        fields = self.keyset_fields
+        if len(values) != len(fields):
+            raise ValueError("Cursor does not match the ordering")
+        values = [self._get_field(name).to_python(value) for (name, _), value in zip(fields, values)]
+        condition = Q()
+        for i, (name, descending) in enumerate(fields):
+            equal = {fields[j][0]: values[j] for j in range(i)}
+            after = {f"{name}__{'lt' if descending else 'gt'}": values[i]}
+            condition |= Q(**equal, **after)
+        return condition
+
+    def get_results(self, request):
+        if ORDER_VAR in self.params:
+            self.cursor = None
+            return super().get_results(request)
+
+        paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        queryset = self.queryset
+        if self.cursor:
+            try:
+                queryset = queryset.filter(self._keyset_filter(decode_cursor(self.cursor)))
+            except (ValueError, TypeError, ValidationError) as e:
+                raise IncorrectLookupParameters(e)
+
+        rows = list(queryset[:self.list_per_page + 1])
+        if len(rows) > self.list_per_page:
+            rows = rows[:self.list_per_page]
+            last = rows[-1]
+            # value_to_string keeps full precision (microseconds included)
+            self.next_cursor = encode_cursor([
+                self._get_field(name).value_to_string(last) for name, _ in self.keyset_fields
+            ])
+
+        self.keyset = True
+        self.result_count = paginator.count
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.full_result_count = None
+        self.result_list = rows
+        self.can_show_all = False
+        self.multi_page = bool(self.cursor or self.next_cursor)
+        self.paginator = paginator
+
+
+class ChoicesListFilter(admin.SimpleListFilter):
+    """
+    Exact-match filter over a fixed list of choices.
+
+    Unlike the default filter for a plain integer field, it never runs
+    SELECT DISTINCT over the table to find the choices.
+    """
+    choices_list = ()
+
+    def lookups(self, request, model_admin):
+        return [(str(value), label) for value, label in self.choices_list]
+
+    def queryset(self, request, queryset):
+        if self.value() is None:
+            return queryset
+        return queryset.filter(**{self.parameter_name: self.value()})
+
+
+class KeysetPaginatedAdmin(admin.ModelAdmin):
+    """
+    ModelAdmin for large tables, see the module docstring.
+    """
+    keyset_ordering = ('-pk',)
+    paginator = EstimatedCountPaginator
+    change_list_template = 'admin/keyset_change_list.html'
+    show_full_result_count = False
+    sortable_by = ()
+
+    def get_ordering(self, request):
+        return list(self.keyset_ordering)
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
@@ -1,6 +1,22 @@
+import sys
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # Register signal handlers
+        from . import signals  # noqa: F401
+
+        # Warm the scraper in the qcluster process only, before it forks workers
+        if sys.argv[1:2] == ['qcluster'] and settings.SCRAPER_WARMUP:
+            try:
+                from automation.selenium_scraper import warm_up
+                warm_up()
+            except Exception as e:
+                # The first job will retry and report the error on its own
+                print(f"Scraper warm-up failed: {e}")
@@ -1,4 +1,4 @@
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, throttle_classes
 from rest_framework.response import Response
 from rest_framework import status
 from django.contrib.auth.models import User
@@ -6,8 +6,11 @@ from django.contrib.auth.hashers import make_password
 from django.contrib.auth import authenticate
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from .throttling import AuthBurstRateThrottle, LoginRateThrottle, RegisterRateThrottle
+
 
 @api_view(["POST"])
+@throttle_classes([RegisterRateThrottle, AuthBurstRateThrottle])
 def register_user(request):
     username = request.data.get("username")
     password = request.data.get("password")
@@ -36,6 +39,7 @@ def register_user(request):
 
 
 @api_view(["POST"])
+@throttle_classes([LoginRateThrottle, AuthBurstRateThrottle])
 def login_user(request):
     username = request.data.get("username")
     password = request.data.get("password")
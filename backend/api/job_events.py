@@ -0,0 +1,121 @@
+"""
+Lightweight change notifications for AutomationJob progress.
+
+Every time a job is saved its revision is bumped in the `job_events` cache,
+shared by all processes and never culled; the revision of a finished job is
+dropped again, so the cache only holds the jobs still in flight. The SSE
+endpoint waits on that
+revision instead of polling the database: one watcher per event loop checks
+the revisions of all watched jobs in a single cache read and only wakes the
+streams whose job actually changed.
+"""
+import asyncio
+import time
+import weakref
+
+from django.conf import settings
+from django.core.cache import caches
+
+# Revisions only need to outlive the jobs that are being watched
+REVISION_TIMEOUT = 60 * 60 * 24
+
+# Returned by JobChangeHub.wait_for_change when a known revision vanished from
+# the cache (expired or evicted); the caller must re-read the job
+REVISION_MISSING = object()
+
+
+def _get_cache():
+    return caches['job_events']
+
+
+def _revision_key(job_id: int) -> str:
+    return f"automation_job:{job_id}:revision"
+
+
+def notify_job_changed(job_id: int):
+    """
+    Bump the revision of a job so that any open event streams pick it up.
+    """
+    _get_cache().set(_revision_key(job_id), time.time_ns(), REVISION_TIMEOUT)
+
+
+def forget_job_revision(job_id: int):
+    """
+    Drop the revision of a finished job. Streams still waiting on it see it
+    vanish and re-read the job from the database.
+    """
+    _get_cache().delete(_revision_key(job_id))
+
+
+async def aget_job_revision(job_id: int):
+    """
+    Return the current revision of a job (None if it was never notified).
+    """
+    return await _get_cache().aget(_revision_key(job_id))
+
+
+class JobChangeHub:
+    """
+    Fan-out of job revision changes to the streams waiting on them.
+
+    Idle streams only hold a future; the single polling task runs while at
+    least one stream is waiting and stops as soon as the last one leaves.
+    """
+
+    def __init__(self, poll_interval: float):
+        self.poll_interval = poll_interval
+        self._waiters = set()
+        self._task = None
+
+    async def wait_for_change(self, job_id: int, revision, timeout: float):
+        """
+        Wait until the revision of a job differs from `revision`.
+
+        Returns:
+            The new revision, None if `timeout` seconds passed without a
+            change, or REVISION_MISSING if the revision left the cache
+        """
+        future = asyncio.get_running_loop().create_future()
+        waiter = (job_id, revision, future)
+        self._waiters.add(waiter)
+        if self._task is None:
+            self._task = asyncio.create_task(self._poll())
+        try:
+            await asyncio.wait([future], timeout=timeout)
+        finally:
+            self._waiters.discard(waiter)
+        return future.result() if future.done() else None
+
+    async def _poll(self):
+        try:
+            while self._waiters:
+                await asyncio.sleep(self.poll_interval)
+                waiters = list(self._waiters)
+                keys = {_revision_key(job_id) for job_id, _, _ in waiters}
+                revisions = await _get_cache().aget_many(keys)
+                for job_id, revision, future in waiters:
+                    if future.done():
+                        continue
+                    key = _revision_key(job_id)
+                    if key not in revisions:
+                        # Never notified yet is no change, a lost revision is
+                        if revision is not None:
+                            future.set_result(REVISION_MISSING)
+                    elif revisions[key] != revision:
+                        future.set_result(revisions[key])
+        finally:
+            self._task = None
+
+
+_hubs = weakref.WeakKeyDictionary()
+
+
+def get_job_change_hub() -> JobChangeHub:
+    """
+    Return the hub bound to the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    hub = _hubs.get(loop)
+    if hub is None:
+        hub = _hubs[loop] = JobChangeHub(settings.JOB_EVENTS_POLL_INTERVAL)
+    return hub
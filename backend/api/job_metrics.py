@@ -0,0 +1,71 @@
+"""
+Aggregation of the per-job timing and throughput metrics.
+"""
+import math
+from typing import Dict, Iterable, List, Optional
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """
+    Nearest-rank percentile of a list of numbers (None for an empty list).
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return round(ordered[rank - 1], 3)
+
+
+def _distribution(values: List[float]) -> Dict:
+    return {
+        'count': len(values),
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'max': round(max(values), 3) if values else None,
+    }
+
+
+def summarize_job_metrics(jobs: Iterable) -> Dict:
+    """
+    Summarize finished AutomationJob rows into p50/p95 per phase, queue wait
+    and total run time, plus page and product totals, the share of failed
+    jobs and throughput.
+    """
+    jobs = list(jobs)
+    phases: Dict[str, List[float]] = {}
+    queue_waits = []
+    run_times = []
+    failed = 0
+    totals = {
+        'pages_fetched': 0,
+        'pages_failed': 0,
+        'products_created': 0,
+        'products_updated': 0,
+        'products_unchanged': 0,
+    }
+
+    for job in jobs:
+        for phase, seconds in (job.phase_durations or {}).items():
+            phases.setdefault(phase, []).append(seconds)
+        if job.status == 'failed':
+            failed += 1
+        if job.queue_wait_seconds is not None:
+            queue_waits.append(job.queue_wait_seconds)
+        if job.started_at and job.finished_at:
+            run_times.append((job.finished_at - job.started_at).total_seconds())
+        for field in totals:
+            totals[field] += getattr(job, field)
+
+    products_synced = totals['products_created'] + totals['products_updated'] + totals['products_unchanged']
+    total_run_time = sum(run_times)
+
+    return {
+        'job_count': len(jobs),
+        'queue_wait_seconds': _distribution(queue_waits),
+        'run_seconds': _distribution(run_times),
+        'phases': {phase: _distribution(values) for phase, values in sorted(phases.items())},
+        'totals': totals,
+        'failure_rate': round(failed / len(jobs), 3) if jobs else None,
+        'pages_per_second': round(totals['pages_fetched'] / total_run_time, 3) if total_run_time else None,
+        'products_per_second': round(products_synced / total_run_time, 3) if total_run_time else None,
+    }
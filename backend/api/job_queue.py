@@ -0,0 +1,95 @@
+"""
+Queueing of AutomationJobs with single-flight coalescing.
+
+While a job of a given type and parameters is queued or running it holds an
+`active_key`; the unique index on that column guarantees that concurrent
+requests for the same work end up sharing one job instead of each queueing
+their own.
+"""
+import hashlib
+import json
+from typing import Optional, Tuple
+
+from django.db import IntegrityError, transaction
+
+from .models import AutomationJob
+
+# Django-Q task run for each job type (dotted paths keep the heavy task
+# modules out of the web process)
+JOB_TASKS = {
+    'scrape_products': 'api.tasks.run_scrape_products_job',
+}
+
+
+def get_active_key(job_type: str, parameters: dict) -> str:
+    """
+    Identify "the same work": job type plus canonicalized parameters.
+    """
+    canonical = json.dumps({'job_type': job_type, 'parameters': parameters}, sort_keys=True)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def queue_job_task(job: AutomationJob):
+    """
+    Hand a job to Django-Q. Also used to requeue a job whose worker died;
+    the task resumes from the job's checkpoint.
+    """
+    from django_q.tasks import async_task
+    
+    async_task(
+        JOB_TASKS[job.job_type],
+        job.id,
+        task_name=f'{job.job_type}_{job.id}_{job.attempts}'
+    )
+
+
+def _create_job(job_type: str, parameters: dict, active_key: Optional[str]) -> AutomationJob:
+    # Savepoint so a unique violation doesn't break an outer transaction
+    with transaction.atomic():
+        return AutomationJob.objects.create(
+            job_type=job_type,
+            status='queued',
+            parameters=parameters,
+            active_key=active_key
+        )
+
+
+def enqueue_job(job_type: str, parameters: Optional[dict] = None, force: bool = False) -> Tuple[AutomationJob, bool]:
+    """
+    Create and queue a job unless an identical one is already queued or running.
+    
+    Args:
+        job_type: One of AutomationJob.JOB_TYPE_CHOICES
+        parameters: JSON-serializable job parameters
+        force: Always queue a new job, even if an identical one is active
+    
+    Returns:
+        (job, created) - created is False when an active job was reused
+    """
+    parameters = parameters or {}
+    active_key = get_active_key(job_type, parameters)
+    
+    job = None
+    while job is None:
+        try:
+            job = _create_job(job_type, parameters, active_key)
+        except IntegrityError:
+            if force:
+                # Run anyway, without taking over the other job's key
+                job = _create_job(job_type, parameters, None)
+                break
+            existing = AutomationJob.objects.filter(active_key=active_key).first()
+            if existing is not None:
+                return existing, False
+            # The active job finished in between, try to claim the key again
+    
+    try:
+        queue_job_task(job)
+    except Exception as e:
+        # Don't leave a job that will never run holding the key
+        job.status = 'failed'
+        job.error_message = f"Failed to queue job: {e}"
+        job.save()
+        raise
+    
+    return job, True
@@ -0,0 +1,268 @@
+"""
+Benchmark the API, sync and scraper hot paths on seeded synthetic data.
+
+Runs against a throwaway test database (in-memory with DB_ENGINE=sqlite), so
+it never touches real data:
+
+    DB_ENGINE=sqlite python manage.py benchmark --sizes 10000 100000 --output bench.json
+    DB_ENGINE=sqlite python manage.py benchmark --save-baseline benchmarks/baseline.json
+    DB_ENGINE=sqlite python manage.py benchmark --baseline benchmarks/baseline.json
+
+With --baseline the run fails if any timing is more than --tolerance slower
+than the baseline.
+"""
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+from decimal import Decimal
+from urllib.parse import urlsplit
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, RequestFactory
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from rest_framework.pagination import CursorPagination
+
+from api.models import AutomationJob, Product, ProductChange
+from api.views import ProductViewSet
+from automation.sync import sync_products_to_db
+
+SEED_BATCH_SIZE = 5000
+RATING_WORDS = ["Zero", "One", "Two", "Three", "Four", "Five"]
+
+
+class ProductPagePagination(CursorPagination):
+    """
+    Fixed-size product pages, so the list timing doesn't grow with the
+    catalogue (the product API itself returns the full list).
+    """
+    page_size = 100
+    ordering = ('-last_updated', '-id')
+
+
+# The product list view, paginated for the benchmark only
+paginated_product_list = ProductViewSet.as_view({'get': 'list'}, pagination_class=ProductPagePagination)
+
+
+def _timed(func, repeat: int) -> float:
+    """
+    Best-of-`repeat` wall time of func() in seconds.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best, 6)
+
+
+def _scraped_product(name: str, price: str) -> dict:
+    return {
+        "name": name,
+        "price": price,
+        "rating": 3,
+        "stock": 1,
+        "image_url": f"https://books.toscrape.com/media/{name}.jpg",
+        "source_url": f"https://books.toscrape.com/catalogue/{name}/index.html",
+    }
+
+
+def _listing_html(product_count: int) -> str:
+    """
+    A synthetic page in the books.toscrape.com listing markup.
+    """
+    pods = []
+    for i in range(product_count):
+        pods.append(
+            '<article class="product_pod">'
+            f'<img src="../media/cache/{i}.jpg">'
+            f'<p class="star-rating {RATING_WORDS[i % 6]}"></p>'
+            f'<h3><a href="../catalogue/book-{i}/index.html" title="Book {i}">Book {i}</a></h3>'
+            f'<p class="price_color">£{10 + i % 40}.99</p>'
+            '<p class="instock availability">In stock</p>'
+            '</article>'
+        )
+    return "<html><body>" + "".join(pods) + "</body></html>"
+
+
+class Command(BaseCommand):
+    help = "Benchmark API, sync and scraper hot paths on seeded synthetic data."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000],
+                            help="Catalogue sizes to seed (e.g. 10000 100000 1000000)")
+        parser.add_argument('--repeat', type=int, default=3, help="Runs per timing, the best is kept")
+        parser.add_argument('--sync-batch', type=int, default=1000,
+                            help="Products per sync_products_to_db call")
+        parser.add_argument('--output', help="Write results as JSON to this file (default: stdout)")
+        parser.add_argument('--baseline', help="Compare against this results file and fail on regressions")
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help="Allowed slowdown against the baseline (0.25 = 25%%)")
+        parser.add_argument('--save-baseline', help="Also write the results to this baseline file")
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        results = {
+            'meta': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'repeat': repeat,
+                'sync_batch': options['sync_batch'],
+                'timestamp': timezone.now().isoformat(),
+            },
+            'results': {},
+        }
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            # Never download images, the sync timings measure the database work
+            with override_settings(IMAGE_CACHE_ENABLED=False):
+                for size in sorted(options['sizes']):
+                    self.stderr.write(f"Benchmarking {size} products...")
+                    results['results'][str(size)] = self._run_size(size, repeat, options['sync_batch'])
+            results['results']['scraper'] = self._run_scraper(repeat)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        output = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output)
+        else:
+            self.stdout.write(output)
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w') as f:
+                f.write(output)
+
+        if options['baseline']:
+            self._compare(results, options['baseline'], options['tolerance'])
+
+    def _seed(self, size: int):
+        # Raw deletes skip the per-row post_delete change-feed signal
+        Product.objects.all()._raw_delete(Product.objects.db)
+        ProductChange.objects.all()._raw_delete(ProductChange.objects.db)
+        AutomationJob.objects.all().delete()
+        now = timezone.now()
+        for offset in range(0, size, SEED_BATCH_SIZE):
+            Product.objects.bulk_create([
+                Product(
+                    name=f"Product {i}",
+                    price=Decimal(10 + i % 90) + Decimal("0.99"),
+                    stock=i % 2,
+                    url=f"https://books.toscrape.com/catalogue/product-{i}/index.html",
+                    rating=i % 6,
+                    image_url=f"https://books.toscrape.com/media/product-{i}.jpg",
+                    source_url=f"https://books.toscrape.com/catalogue/product-{i}/index.html",
+                    source='books_toscrape',
+                    last_synced_at=now,
+                )
+                for i in range(offset, min(offset + SEED_BATCH_SIZE, size))
+            ])
+        statuses = [status for status, _ in AutomationJob.STATUS_CHOICES]
+        job_count = max(size // 10, 100)
+        for offset in range(0, job_count, SEED_BATCH_SIZE):
+            AutomationJob.objects.bulk_create([
+                AutomationJob(job_type='scrape_products', status=statuses[i % len(statuses)])
+                for i in range(offset, min(offset + SEED_BATCH_SIZE, job_count))
+            ])
+
+    def _run_size(self, size: int, repeat: int, sync_batch: int) -> dict:
+        start = time.perf_counter()
+        self._seed(size)
+        timings = {'seed_seconds': round(time.perf_counter() - start, 3)}
+
+        client = Client()
+        factory = RequestFactory()
+        ids = list(Product.objects.values_list('id', flat=True)[:1000])
+        sample_ids = random.Random(size).sample(ids, min(len(ids), 100))
+
+        def list_products():
+            response = paginated_product_list(factory.get('/api/products/')).render()
+            assert response.status_code == 200
+            next_page = urlsplit(response.data['next'])
+            response = paginated_product_list(factory.get(f"{next_page.path}?{next_page.query}")).render()
+            assert response.status_code == 200
+
+        def retrieve_products():
+            for product_id in sample_ids:
+                assert client.get(f'/api/products/{product_id}/').status_code == 200
+
+        def list_jobs():
+            response = client.get('/api/automation/jobs/?status=completed')
+            assert response.status_code == 200
+            assert client.get(response.json()['next'] or '/api/automation/jobs/').status_code == 200
+
+        timings['product_list_2_pages'] = _timed(list_products, repeat)
+        timings['product_retrieve_100'] = _timed(retrieve_products, repeat)
+        timings['job_list_filtered_2_pages'] = _timed(list_jobs, repeat)
+
+        # sync_products_to_db in its three modes, on sync_batch existing names
+        existing = [f"Product {i}" for i in range(min(sync_batch, size))]
+        counter = iter(range(10 ** 9))
+
+        def sync_all_new():
+            run = next(counter)
+            sync_products_to_db([_scraped_product(f"New {run}-{i}", "9.99") for i in range(sync_batch)])
+
+        def sync_all_changed():
+            price = f"{next(counter) % 1000}.49"
+            sync_products_to_db([_scraped_product(name, price) for name in existing])
+
+        def sync_no_change():
+            sync_products_to_db(unchanged)
+
+        timings['sync_all_new'] = _timed(sync_all_new, repeat)
+        timings['sync_all_changed'] = _timed(sync_all_changed, repeat)
+        # Primed right before timing, after the all-changed runs moved the prices
+        unchanged = [_scraped_product(name, "1.25") for name in existing]
+        sync_products_to_db(unchanged)
+        timings['sync_no_change'] = _timed(sync_no_change, repeat)
+        return timings
+
+    def _run_scraper(self, repeat: int) -> dict:
+        """
+        Time parse_books_toscrape_page on a synthetic 1000-product listing page.
+        Needs Selenium and a local Chrome; skipped otherwise.
+        """
+        try:
+            from automation.selenium_scraper import _start_driver, parse_books_toscrape_page
+            driver = _start_driver()
+        except Exception as e:
+            return {'skipped': f"Browser not available: {e}"}
+
+        fd, path = tempfile.mkstemp(suffix='.html')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(_listing_html(1000))
+            driver.get(f"file://{path}")
+            return {'parse_listing_1000': _timed(lambda: parse_books_toscrape_page(driver), repeat)}
+        finally:
+            driver.quit()
+            os.remove(path)
+
+    def _compare(self, results: dict, baseline_path: str, tolerance: float):
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+
+        regressions = []
+        for group, timings in results['results'].items():
+            for name, seconds in timings.items():
+                previous = baseline.get('results', {}).get(group, {}).get(name)
+                if name == 'seed_seconds' or not isinstance(seconds, float) or not isinstance(previous, float):
+                    continue
+                if seconds > previous * (1 + tolerance):
+                    regressions.append(f"{group}.{name}: {seconds:.4f}s vs baseline {previous:.4f}s")
+
+        if regressions:
+            raise CommandError("Performance regressions:\n  " + "\n  ".join(regressions))
+        self.stderr.write(self.style.SUCCESS(f"No regressions against {baseline_path} (tolerance {tolerance:.0%})"))
@@ -0,0 +1,149 @@
+"""
+Measure cold-start cost of the web and worker processes.
+
+Each target starts in a fresh interpreter and goes through the same startup
+path as the real process, without serving anything:
+
+    python manage.py benchmark_startup
+    python manage.py benchmark_startup --repeat 5 --top 15 --output startup.json
+
+Reported per target: wall time of the whole process, time spent in Django
+setup and imports, peak RSS (null on Windows, which lacks the resource
+module), and the slowest top-level imports (from python -X importtime).
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+SETUP = (
+    "import django\n"
+    "django.setup()\n"
+)
+
+# Startup path of each process, run in a fresh interpreter
+TARGETS = {
+    # runserver: Django setup, system checks and URLconf loading before serving
+    'runserver': SETUP + (
+        "from django.core import management\n"
+        "management.call_command('check')\n"
+        "from django.urls import get_resolver\n"
+        "get_resolver().url_patterns\n"
+    ),
+    # qcluster: Django setup (runs the ready() warm-up), the cluster module,
+    # then the task modules each worker imports for its first job
+    'qcluster': SETUP + (
+        "import django_q.cluster\n"
+        "import api.tasks, api.scheduler\n"
+    ),
+    'wsgi': (
+        "from core.wsgi import application\n"
+    ),
+}
+
+PROBE = """
+import json, sys, time
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+start = time.perf_counter()
+sys.argv = ['manage.py', {target!r}]
+{code}
+max_rss_mb = None
+if resource is not None:
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, kilobytes elsewhere
+    max_rss_mb = max_rss / (1024 * 1024) if sys.platform == 'darwin' else max_rss / 1024
+print(json.dumps({{
+    'startup_seconds': time.perf_counter() - start,
+    'max_rss_mb': max_rss_mb,
+    'selenium_loaded': 'selenium' in sys.modules,
+}}))
+"""
+
+
+def _slowest_imports(importtime_log: str, top: int) -> list:
+    """
+    Top-level packages with the largest cumulative import time (seconds).
+    """
+    totals = {}
+    for line in importtime_log.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        package = name.strip().split('.')[0]
+        # The outermost entry of a package carries its full cumulative time
+        totals[package] = max(totals.get(package, 0), int(cumulative))
+    slowest = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [{'module': name, 'seconds': round(us / 1e6, 4)} for name, us in slowest]
+
+
+class Command(BaseCommand):
+    help = "Report import time and RSS at startup for runserver, qcluster and the WSGI app."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--targets', nargs='+', choices=list(TARGETS), default=list(TARGETS))
+        parser.add_argument('--repeat', type=int, default=3, help="Cold starts per target, the best is kept")
+        parser.add_argument('--top', type=int, default=10, help="Number of slowest imports to list")
+        parser.add_argument('--output', help="Write results as JSON to this file (default: stdout)")
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'core.settings'))
+        results = {
+            'meta': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'repeat': options['repeat'],
+                'scraper_warmup': settings.SCRAPER_WARMUP,
+            },
+            'results': {},
+        }
+
+        for target in options['targets']:
+            self.stderr.write(f"Starting {target}...")
+            best = None
+            for _ in range(options['repeat']):
+                run = self._run(target, env, importtime=False)
+                if best is None or run['wall_seconds'] < best['wall_seconds']:
+                    best = run
+            profiled = self._run(target, env, importtime=True)
+            best['slowest_imports'] = _slowest_imports(profiled['importtime'], options['top'])
+            best.pop('importtime', None)
+            results['results'][target] = best
+
+        output = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output)
+        else:
+            self.stdout.write(output)
+
+    def _run(self, target: str, env: dict, importtime: bool) -> dict:
+        command = [sys.executable]
+        if importtime:
+            command += ['-X', 'importtime']
+        command += ['-c', PROBE.format(target=target, code=TARGETS[target])]
+
+        start = time.perf_counter()
+        completed = subprocess.run(command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+        wall = time.perf_counter() - start
+        if completed.returncode != 0:
+            raise CommandError(f"{target} failed to start:\n{completed.stderr[-2000:]}")
+
+        probe = json.loads(completed.stdout.strip().splitlines()[-1])
+        return {
+            'wall_seconds': round(wall, 4),
+            'startup_seconds': round(probe['startup_seconds'], 4),
+            'max_rss_mb': round(probe['max_rss_mb'], 1) if probe['max_rss_mb'] is not None else None,
+            'selenium_loaded': probe['selenium_loaded'],
+            'importtime': completed.stderr,
+        }
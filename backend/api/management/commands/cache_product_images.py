@@ -0,0 +1,46 @@
+"""
+Fill the local image cache for products whose image isn't cached yet.
+
+Sync only fetches the images of new products and changed image_urls; this
+backfills products synced before the cache existed, images whose download
+failed, and image_urls edited through the API or admin:
+
+    python manage.py cache_product_images
+    python manage.py cache_product_images --batch-size 200
+"""
+from django.core.management.base import BaseCommand
+
+from api.models import Product
+from automation.sync import cache_product_images
+
+
+class Command(BaseCommand):
+    help = "Download product images that are not in the local image cache yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Products per batch")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        missing = (
+            Product.objects
+            .filter(image_hash='', image_url__isnull=False)
+            .exclude(image_url='')
+            .order_by('id')
+        )
+
+        cached = failed = 0
+        last_id = 0
+        while True:
+            batch = list(missing.filter(id__gt=last_id).only('id', 'image_url')[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            # Stores the hashes and logs the products in the change feed
+            counts = cache_product_images(batch)
+            cached += counts['cached']
+            failed += counts['failed']
+            self.stdout.write(f"Processed {cached + failed} products...")
+
+        self.stdout.write(self.style.SUCCESS(f"Cached images of {cached} products, {failed} failed"))
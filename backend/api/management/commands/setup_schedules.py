@@ -0,0 +1,42 @@
+"""
+Register the recurring Django-Q schedules used by the api app.
+"""
+from django.core.management.base import BaseCommand
+from django_q.models import Schedule
+
+from api.scheduler import ensure_sync_schedules
+
+SCHEDULES = [
+    {
+        'name': 'prune_old_jobs',
+        'func': 'api.tasks.prune_old_jobs',
+        'schedule_type': Schedule.DAILY,
+    },
+    {
+        'name': 'reap_stale_jobs',
+        'func': 'api.tasks.reap_stale_jobs',
+        'schedule_type': Schedule.MINUTES,
+        'minutes': 5,
+    },
+]
+
+
+class Command(BaseCommand):
+    help = "Create or update the recurring Django-Q schedules (safe to run repeatedly)."
+
+    def handle(self, *args, **options):
+        for definition in SCHEDULES:
+            defaults = {key: value for key, value in definition.items() if key != 'name'}
+            schedule, created = Schedule.objects.update_or_create(
+                name=definition['name'],
+                defaults={**defaults, 'repeats': -1}
+            )
+            action = "Created" if created else "Updated"
+            self.stdout.write(self.style.SUCCESS(f"{action} schedule '{schedule.name}'"))
+
+        # Per-source sync schedules adapt their own interval, only create missing ones
+        for schedule, created in ensure_sync_schedules():
+            action = "Created" if created else "Kept"
+            self.stdout.write(self.style.SUCCESS(
+                f"{action} schedule '{schedule.name}' (every {schedule.minutes} minutes)"
+            ))
@@ -0,0 +1,192 @@
+"""
+Per-request profiling middleware.
+
+Enabled with settings.PROFILING_ENABLED. For every request it records the
+number and total duration of DB queries, the time spent in serializers, the
+remaining view time and the total, and returns them as a `Server-Timing`
+header (shown in the browser devtools' network timing tab). Repeated
+identical SQL, the usual N+1 symptom, is flagged in a header and the log.
+A sample of sync requests runs under cProfile, one at a time; samples slower
+than PROFILING_SLOW_REQUEST_MS are dumped to PROFILING_DUMP_DIR for
+`python -m pstats` or snakeviz.
+
+Queries are timed by an execute wrapper on every connection reporting to the
+request in the current context, so queries of async views (run on executor
+threads) are counted too.
+"""
+import contextvars
+import cProfile
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+# Profile of the request being handled, None when not profiling
+_current_profile = contextvars.ContextVar('request_profile', default=None)
+# Whether the current context is inside a time_serialization() block
+_serializing = contextvars.ContextVar('serializing', default=False)
+# cProfile allows one active profiler per process (ValueError on 3.12+)
+_profiler_lock = threading.Lock()
+
+
+class RequestProfile:
+    """
+    Measurements collected while handling one request.
+    """
+
+    def __init__(self):
+        self.query_count = 0
+        self.query_seconds = 0.0
+        self.serializer_seconds = 0.0
+        # Query time spent inside serializers, counted in both of the above
+        self.serializer_query_seconds = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.query_seconds += duration
+            if _serializing.get():
+                self.serializer_query_seconds += duration
+            self.query_count += 1
+            self.statements[sql] += 1
+
+    def repeated_statements(self, threshold: int):
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= threshold]
+
+
+def _profile_query(execute, sql, params, many, context):
+    profile = _current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    return profile(execute, sql, params, many, context)
+
+
+def _install_query_wrapper(sender, connection, **kwargs):
+    if _profile_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_profile_query)
+
+
+@contextmanager
+def time_serialization():
+    """
+    Add the enclosed block's duration to the current request's serializer time.
+    Nested blocks are only counted once.
+    """
+    profile = _current_profile.get()
+    if profile is None or _serializing.get():
+        yield
+        return
+    token = _serializing.set(True)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.serializer_seconds += time.perf_counter() - start
+        _serializing.reset(token)
+
+
+class ProfilingMiddleware:
+    """
+    Adds Server-Timing, X-Query-Count and X-Repeated-Queries headers and
+    writes sampled cProfile dumps of slow requests. Runs natively in both
+    sync and async stacks; async requests are never sampled, since cProfile
+    would also record every other coroutine on the event loop.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        connection_created.connect(_install_query_wrapper, dispatch_uid='profiling_query_wrapper')
+        for connection in connections.all(initialized_only=True):
+            _install_query_wrapper(None, connection)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        profiler = None
+        if random.random() < settings.PROFILING_SAMPLE_RATE and _profiler_lock.acquire(blocking=False):
+            profiler = cProfile.Profile()
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        start = time.perf_counter()
+        try:
+            if profiler is not None:
+                profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+        finally:
+            _current_profile.reset(token)
+            if profiler is not None:
+                _profiler_lock.release()
+        return self._report(request, response, profile, start, profiler)
+
+    async def __acall__(self, request):
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+        return self._report(request, response, profile, start, None)
+
+    def _report(self, request, response, profile, start, profiler):
+        total_ms = (time.perf_counter() - start) * 1000
+        db_ms = profile.query_seconds * 1000
+        serializer_ms = profile.serializer_seconds * 1000
+        # Time in the view itself: neither in queries nor in serializers
+        view_ms = max(total_ms - db_ms - serializer_ms + profile.serializer_query_seconds * 1000, 0.0)
+
+        response['Server-Timing'] = ", ".join([
+            f'db;dur={db_ms:.1f};desc="{profile.query_count} queries"',
+            f'serializer;dur={serializer_ms:.1f}',
+            f'view;dur={view_ms:.1f}',
+            f'total;dur={total_ms:.1f}',
+        ])
+        response['X-Query-Count'] = str(profile.query_count)
+
+        repeated = profile.repeated_statements(settings.PROFILING_REPEATED_QUERY_THRESHOLD)
+        if repeated:
+            response['X-Repeated-Queries'] = str(len(repeated))
+            for sql, count in repeated:
+                logger.warning("Possible N+1 on %s %s: %d x %s", request.method, request.path, count, sql[:200])
+
+        if profiler is not None and total_ms >= settings.PROFILING_SLOW_REQUEST_MS:
+            self._dump(profiler, request, total_ms)
+
+        return response
+
+    def _dump(self, profiler, request, total_ms):
+        os.makedirs(settings.PROFILING_DUMP_DIR, exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', request.path).strip('_') or 'root'
+        filename = f"{time.strftime('%Y%m%d-%H%M%S')}_{request.method}_{slug}_{total_ms:.0f}ms.prof"
+        path = os.path.join(settings.PROFILING_DUMP_DIR, filename)
+        profiler.dump_stats(path)
+        logger.info("Slow request profile written to %s", path)
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_product_last_synced_at_alter_automationjob_job_type_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='automationjob',
+            name='progress',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Job progress as a percentage (0-100)'),
+        ),
+        migrations.AddField(
+            model_name='automationjob',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_automationjob_progress'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='automationjob',
+            index=models.Index(fields=['status', 'created_at'], name='api_job_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='automationjob',
+            index=models.Index(fields=['job_type', 'created_at'], name='api_job_type_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='automationjob',
+            index=models.Index(fields=['created_at'], name='api_job_created_idx'),
+        ),
+    ]
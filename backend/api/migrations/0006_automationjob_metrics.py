@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_automationjob_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='automationjob',
+            name='pages_failed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='automationjob',
+            name='pages_fetched',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='automationjob',
+            name='phase_durations',
+            field=models.JSONField(blank=True, default=dict, help_text="Seconds spent per phase, e.g. {'page_load': 2.1}"),
+        ),
+        migrations.AddField(
+            model_name='automationjob',
+            name='products_created',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='automationjob',
+            name='products_unchanged',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='automationjob',
+            name='products_updated',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='automationjob',
+            name='queue_wait_seconds',
+            field=models.FloatField(blank=True, help_text='Seconds between created_at and started_at', null=True),
+        ),
+        migrations.AddField(
+            model_name='automationjob',
+            name='started_at',
+            field=models.DateTimeField(blank=True, help_text='When a worker picked up the job', null=True),
+        ),
+    ]
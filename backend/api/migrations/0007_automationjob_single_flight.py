@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_automationjob_metrics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='automationjob',
+            name='active_key',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='automationjob',
+            name='parameters',
+            field=models.JSONField(blank=True, default=dict, help_text='Parameters the job was requested with'),
+        ),
+    ]
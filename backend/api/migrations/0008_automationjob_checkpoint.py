@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_automationjob_single_flight'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='automationjob',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Number of times a worker has picked up the job'),
+        ),
+        migrations.AddField(
+            model_name='automationjob',
+            name='checkpoint',
+            field=models.JSONField(blank=True, default=dict, help_text="Progress saved after each completed page, e.g. {'last_page': 3}"),
+        ),
+        migrations.AddField(
+            model_name='automationjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, help_text='Last sign of life from the worker running the job', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='automationjob',
+            index=models.Index(fields=['status', 'heartbeat_at'], name='api_job_status_heartbeat_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:44
+
+from django.db import migrations, models
+
+
+def tag_scraped_products(apps, schema_editor):
+    # Everything synced before sources existed came from books.toscrape.com
+    Product = apps.get_model('api', 'Product')
+    Product.objects.filter(last_synced_at__isnull=False).update(source='books_toscrape')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_automationjob_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='source',
+            field=models.CharField(blank=True, default='', help_text='Scrape source the product is synced from (empty if created manually)', max_length=50),
+        ),
+        migrations.RunPython(tag_scraped_products, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['source', 'name'], name='api_product_source_name_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:55
+
+from django.db import migrations, models
+
+
+def add_error_message_fulltext_index(apps, schema_editor):
+    # Only MySQL answers the error_message__search lookup from an index
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute(
+            'CREATE FULLTEXT INDEX api_job_error_message_ft_idx ON api_automationjob (error_message)'
+        )
+
+
+def remove_error_message_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute('DROP INDEX api_job_error_message_ft_idx ON api_automationjob')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_product_source'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['name'], name='api_product_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['last_updated'], name='api_product_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['stock', 'last_updated'], name='api_product_stock_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['rating', 'last_updated'], name='api_product_rating_updated_idx'),
+        ),
+        migrations.RunPython(add_error_message_fulltext_index, remove_error_message_fulltext_index),
+    ]
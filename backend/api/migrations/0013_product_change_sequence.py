@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:07
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def create_sequence(apps, schema_editor):
+    # Continue after the entries logged with auto-increment ids so far
+    ProductChange = apps.get_model('api', 'ProductChange')
+    ProductChangeSequence = apps.get_model('api', 'ProductChangeSequence')
+    last_seq = ProductChange.objects.aggregate(Max('id'))['id__max'] or 0
+    ProductChangeSequence.objects.create(pk=1, last_seq=last_seq)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_product_image_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductChangeSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_seq', models.BigIntegerField(default=0, help_text='Last sequence number handed out')),
+                ('pruned_through', models.BigIntegerField(default=0, help_text='Entries up to this sequence number were pruned')),
+            ],
+        ),
+        migrations.RunPython(create_sequence, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 
+from .lookups import FullTextSearch
+
 
 class Product(models.Model):
     """
@@ -12,16 +14,70 @@ class Product(models.Model):
     rating = models.IntegerField(null=True, blank=True, help_text="Product rating as integer (0-5)")
     image_url = models.URLField(max_length=500, null=True, blank=True, help_text="URL of the product image")
     source_url = models.URLField(max_length=500, null=True, blank=True, help_text="Original source URL of the product")
+    image_hash = models.CharField(max_length=64, blank=True, default='', editable=False, help_text="sha256 of the image in the local image cache (empty if not cached)")
+    source = models.CharField(max_length=50, blank=True, default='', help_text="Scrape source the product is synced from (empty if created manually)")
     last_synced_at = models.DateTimeField(null=True, blank=True, help_text="Last time product was synced from source")
     last_updated = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-last_updated']
+        indexes = [
+            # Back the per-source upsert lookup in sync_products_to_db
+            models.Index(fields=['source', 'name'], name='api_product_source_name_idx'),
+            # Back the admin: prefix search, keyset paging and filters in that order
+            models.Index(fields=['name'], name='api_product_name_idx'),
+            models.Index(fields=['last_updated'], name='api_product_updated_idx'),
+            models.Index(fields=['stock', 'last_updated'], name='api_product_stock_updated_idx'),
+            models.Index(fields=['rating', 'last_updated'], name='api_product_rating_updated_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
 
+class ProductChange(models.Model):
+    """
+    Append-only log of product changes, served by GET /api/products/changes.
+    The id is the feed's sequence number, assigned by ProductChangeSequence
+    rather than auto-increment so that ids become visible in commit order.
+    """
+    ACTION_CHOICES = [
+        ('created', 'created'),
+        ('updated', 'updated'),
+        ('deleted', 'deleted'),
+    ]
+
+    # Not a foreign key: deletions must outlive the product
+    product_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            # Back retention pruning
+            models.Index(fields=['changed_at'], name='api_product_change_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.id} {self.action} product {self.product_id}"
+
+
+class ProductChangeSequence(models.Model):
+    """
+    Single-row counter behind ProductChange ids.
+
+    Writers lock the row until their transaction commits, so a sequence
+    number is only handed out once every lower one is committed (or rolled
+    back) and a consumer's cursor can never skip a late commit.
+    """
+    last_seq = models.BigIntegerField(default=0, help_text="Last sequence number handed out")
+    pruned_through = models.BigIntegerField(default=0, help_text="Entries up to this sequence number were pruned")
+
+    def __str__(self):
+        return f"Product changes up to #{self.last_seq} (pruned through #{self.pruned_through})"
+
+
 class AutomationJob(models.Model):
     """
     Model to track automation jobs (scraping, etc.)
@@ -37,14 +93,60 @@ class AutomationJob(models.Model):
         ('failed', 'failed'),
     ]
 
+    # Statuses after which a job never changes again
+    FINISHED_STATUSES = ('completed', 'failed')
+
     job_type = models.CharField(max_length=50, choices=JOB_TYPE_CHOICES)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    parameters = models.JSONField(default=dict, blank=True, help_text="Parameters the job was requested with")
+    # Set while the job is queued or running, cleared once it finishes. The
+    # unique index makes "one active job per type and parameters" race-free
+    # across web workers (NULLs never collide).
+    active_key = models.CharField(max_length=64, null=True, blank=True, unique=True, editable=False)
+    progress = models.PositiveSmallIntegerField(default=0, help_text="Job progress as a percentage (0-100)")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     finished_at = models.DateTimeField(null=True, blank=True)
     error_message = models.TextField(null=True, blank=True)
 
+    # Timing and throughput metrics, recorded by the task
+    started_at = models.DateTimeField(null=True, blank=True, help_text="When a worker picked up the job")
+    queue_wait_seconds = models.FloatField(null=True, blank=True, help_text="Seconds between created_at and started_at")
+    phase_durations = models.JSONField(default=dict, blank=True, help_text="Seconds spent per phase, e.g. {'page_load': 2.1}")
+    pages_fetched = models.PositiveIntegerField(default=0)
+    pages_failed = models.PositiveIntegerField(default=0)
+    products_created = models.PositiveIntegerField(default=0)
+    products_updated = models.PositiveIntegerField(default=0)
+    products_unchanged = models.PositiveIntegerField(default=0)
+
+    # Checkpointing, so a retried or requeued task resumes instead of restarting
+    checkpoint = models.JSONField(default=dict, blank=True, help_text="Progress saved after each completed page, e.g. {'last_page': 3}")
+    attempts = models.PositiveSmallIntegerField(default=0, help_text="Number of times a worker has picked up the job")
+    heartbeat_at = models.DateTimeField(null=True, blank=True, help_text="Last sign of life from the worker running the job")
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Back the filtered job list (filter + newest-first cursor)
+            models.Index(fields=['status', 'created_at'], name='api_job_status_created_idx'),
+            models.Index(fields=['job_type', 'created_at'], name='api_job_type_created_idx'),
+            # Back the newest-first cursor and retention pruning
+            models.Index(fields=['created_at'], name='api_job_created_idx'),
+            # Back the stale job reaper
+            models.Index(fields=['status', 'heartbeat_at'], name='api_job_status_heartbeat_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.status in self.FINISHED_STATUSES and self.active_key is not None:
+            self.active_key = None
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'active_key'}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.job_type} - {self.status} ({self.created_at})"
+
+
+# "@error_message" admin search, backed by a FULLTEXT index on MySQL (migration 0010)
+AutomationJob._meta.get_field('error_message').register_lookup(FullTextSearch)
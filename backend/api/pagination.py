@@ -0,0 +1,13 @@
+from rest_framework.pagination import CursorPagination
+
+
+class AutomationJobCursorPagination(CursorPagination):
+    """
+    Cursor pagination for the job list, newest first.
+    Cursors stay cheap on large tables because each page is an indexed
+    range scan on created_at instead of an OFFSET.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = '-created_at'
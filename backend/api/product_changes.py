@@ -0,0 +1,116 @@
+"""
+Incremental product change feed.
+
+Every product write appends a ProductChange row: sync_products_to_db in
+bulk, single-object saves and deletes (ViewSet, admin) through signals.
+Consumers poll GET /api/products/changes?since=<seq> and get each product
+changed after that sequence number once, with its current data.
+
+Entries are written in the same transaction as the product changes. Their
+sequence numbers come from ProductChangeSequence, whose row stays locked
+until that transaction commits, so entries become visible in sequence order.
+"""
+from typing import Dict, Iterable
+
+from django.db import transaction
+
+from .models import Product, ProductChange, ProductChangeSequence
+
+
+class ChangesPruned(Exception):
+    """
+    The requested cursor is older than the retained change log.
+    """
+
+
+def record_product_changes(action: str, product_ids: Iterable[int]):
+    """
+    Append one change entry per product, in a single INSERT.
+
+    Takes the sequence lock until the surrounding transaction commits, so
+    call it as the last write of a transaction.
+    """
+    product_ids = list(product_ids)
+    if not product_ids:
+        return
+    with transaction.atomic():
+        sequence, _ = ProductChangeSequence.objects.select_for_update().get_or_create(pk=1)
+        first_seq = sequence.last_seq + 1
+        ProductChange.objects.bulk_create([
+            ProductChange(id=first_seq + offset, product_id=product_id, action=action)
+            for offset, product_id in enumerate(product_ids)
+        ])
+        sequence.last_seq += len(product_ids)
+        sequence.save(update_fields=['last_seq'])
+
+
+def mark_product_changes_pruned(through_seq: int):
+    """
+    Remember that entries up to `through_seq` were deleted, so cursors
+    older than that get ChangesPruned.
+    """
+    with transaction.atomic():
+        sequence, _ = ProductChangeSequence.objects.select_for_update().get_or_create(pk=1)
+        if through_seq > sequence.pruned_through:
+            sequence.pruned_through = through_seq
+            sequence.save(update_fields=['pruned_through'])
+
+
+def get_latest_seq() -> int:
+    """
+    Sequence number of the newest committed change entry (0 if none yet).
+    A new consumer reads it before downloading the full product list, then
+    polls for changes since it.
+    """
+    return ProductChangeSequence.objects.filter(pk=1).values_list('last_seq', flat=True).first() or 0
+
+
+def get_product_changes(since: int, limit: int) -> Dict:
+    """
+    Products changed after sequence number `since`, reading at most `limit`
+    change entries.
+
+    Returns:
+        Dict with "changes" - one (seq, action, product_id, product) tuple
+        per product, product being None for deletions - plus "next", the
+        cursor for the following call, and "has_more"
+
+    Raises:
+        ChangesPruned: If entries after `since` were already pruned
+    """
+    pruned_through = (
+        ProductChangeSequence.objects.filter(pk=1).values_list('pruned_through', flat=True).first() or 0
+    )
+    if since < pruned_through:
+        raise ChangesPruned(f"Changes after {since} are no longer retained, download the full product list")
+
+    entries = list(ProductChange.objects.filter(id__gt=since).order_by('id')[:limit])
+
+    # Collapse to one change per product: its last entry, "created" if the
+    # product was created within the window
+    first_actions = {}
+    last_entries = {}
+    for entry in entries:
+        first_actions.setdefault(entry.product_id, entry.action)
+        last_entries[entry.product_id] = entry
+
+    live_ids = [product_id for product_id, entry in last_entries.items() if entry.action != 'deleted']
+    products = Product.objects.in_bulk(live_ids)
+
+    changes = []
+    for product_id, entry in sorted(last_entries.items(), key=lambda item: item[1].id):
+        if entry.action == 'deleted':
+            changes.append((entry.id, 'deleted', product_id, None))
+            continue
+        product = products.get(product_id)
+        if product is None:
+            # Deleted by a later entry, reported by a later call
+            continue
+        action = 'created' if first_actions[product_id] == 'created' else 'updated'
+        changes.append((entry.id, action, product_id, product))
+
+    return {
+        'changes': changes,
+        'next': entries[-1].id if entries else since,
+        'has_more': len(entries) == limit,
+    }
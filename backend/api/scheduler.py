@@ -0,0 +1,115 @@
+"""
+Adaptive periodic syncs, built on Django-Q schedules.
+
+Every registered scrape source (automation.sources) gets its own
+`sync_<source>` Schedule. Each time it fires, the interval is adjusted to
+the fraction of products that actually changed in the source's recent runs:
+static catalogues are crawled less and less often, catalogues with moving
+prices more often.
+"""
+from datetime import timedelta
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+from automation.sources import SOURCES, get_source
+
+from .job_queue import enqueue_job
+from .models import AutomationJob
+
+
+def get_schedule_name(source: str) -> str:
+    return f"sync_{source}"
+
+
+def get_recent_change_rate(source: str) -> Optional[float]:
+    """
+    Fraction of synced products that were created or updated over the last
+    settings.SYNC_CHANGE_HISTORY completed runs of a source (None without history).
+    """
+    runs = AutomationJob.objects.filter(
+        job_type='scrape_products',
+        parameters__source=source,
+        status='completed'
+    ).values_list(
+        'products_created', 'products_updated', 'products_unchanged'
+    )[:settings.SYNC_CHANGE_HISTORY]
+
+    changed = total = 0
+    for created, updated, unchanged in runs:
+        changed += created + updated
+        total += created + updated + unchanged
+    return changed / total if total else None
+
+
+def get_next_interval(current_minutes: int, change_rate: Optional[float]) -> int:
+    """
+    Back off when little changes, tighten when a lot changes, always staying
+    within SYNC_MIN_INTERVAL_MINUTES and SYNC_MAX_INTERVAL_MINUTES.
+    """
+    minutes = current_minutes
+    if change_rate is not None:
+        if change_rate <= settings.SYNC_BACKOFF_BELOW:
+            minutes = current_minutes * 2
+        elif change_rate >= settings.SYNC_TIGHTEN_ABOVE:
+            minutes = current_minutes // 2
+    return min(max(minutes, settings.SYNC_MIN_INTERVAL_MINUTES), settings.SYNC_MAX_INTERVAL_MINUTES)
+
+
+def ensure_sync_schedules():
+    """
+    Create the `sync_<source>` schedule of every source that doesn't have one.
+    Existing schedules are left alone so their adapted interval survives.
+    
+    Returns:
+        List of (schedule, created) tuples
+    """
+    from django_q.models import Schedule
+
+    results = []
+    for source in SOURCES:
+        results.append(Schedule.objects.get_or_create(
+            name=get_schedule_name(source),
+            defaults={
+                'func': 'api.scheduler.run_scheduled_sync',
+                'args': repr(source),
+                'schedule_type': Schedule.MINUTES,
+                'minutes': settings.SYNC_INITIAL_INTERVAL_MINUTES,
+                'repeats': -1,
+            }
+        ))
+    return results
+
+
+def run_scheduled_sync(source: str) -> Dict:
+    """
+    Django-Q task fired by a source's schedule: queues the sync job, then
+    adapts the schedule's interval to the recent change rate.
+    
+    If the previous sync is still queued or running the request is coalesced
+    into it and the interval is left as is, since there is no new history to
+    adapt to.
+    """
+    from django_q.models import Schedule
+
+    get_source(source)  # Reject unknown sources before queueing anything
+    job, created = enqueue_job('scrape_products', {'source': source})
+
+    change_rate = get_recent_change_rate(source)
+    schedule = Schedule.objects.filter(name=get_schedule_name(source)).first()
+    interval = schedule.minutes if schedule is not None else None
+    if created and schedule is not None:
+        current = schedule.minutes or settings.SYNC_INITIAL_INTERVAL_MINUTES
+        interval = get_next_interval(current, change_rate)
+        if interval != schedule.minutes:
+            schedule.minutes = interval
+            schedule.next_run = timezone.now() + timedelta(minutes=interval)
+            schedule.save(update_fields=['minutes', 'next_run'])
+
+    return {
+        'job_id': job.id,
+        'coalesced': not created,
+        'change_rate': change_rate,
+        'interval_minutes': interval,
+    }
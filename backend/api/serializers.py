@@ -1,17 +1,52 @@
+from django.urls import reverse
 from rest_framework import serializers
+from .middleware import time_serialization
 from .models import Product, AutomationJob
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProfiledSerializerMixin:
+    """
+    Reports serialization time to the profiling middleware (when enabled).
+    """
+    def to_representation(self, instance):
+        with time_serialization():
+            return super().to_representation(instance)
+
+
+class ProductSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for Product model.
+    Adds the URLs of the locally cached image and its thumbnail (null until
+    the image is cached).
     """
+    cached_image_url = serializers.SerializerMethodField()
+    thumbnail_url = serializers.SerializerMethodField()
+
     class Meta:
         model = Product
         fields = "__all__"
 
+    def _image_url(self, obj, view_name):
+        if not obj.image_hash:
+            return None
+        url = reverse(view_name, kwargs={'image_hash': obj.image_hash})
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+    def get_cached_image_url(self, obj):
+        return self._image_url(obj, 'product_image')
+
+    def get_thumbnail_url(self, obj):
+        return self._image_url(obj, 'product_image_thumbnail')
+
+    def update(self, instance, validated_data):
+        # The cached image belongs to the old URL, `cache_product_images` fetches the new one
+        if 'image_url' in validated_data and validated_data['image_url'] != instance.image_url:
+            validated_data['image_hash'] = ''
+        return super().update(instance, validated_data)
+
 
-class AutomationJobSerializer(serializers.ModelSerializer):
+class AutomationJobSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for AutomationJob model.
     """
@@ -0,0 +1,56 @@
+"""
+Model signal handlers for the api app.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from rest_framework_simplejwt.settings import api_settings
+
+from .authentication import user_cache
+from .job_events import forget_job_revision, notify_job_changed
+from .models import AutomationJob, Product
+from .product_changes import record_product_changes
+
+
+@receiver(post_save, sender=AutomationJob)
+def automation_job_saved(sender, instance, **kwargs):
+    """
+    Wake up event streams watching this job once the save is committed, so
+    they never re-read the job before the change is visible. Finished jobs
+    drop their revision instead of bumping it, which wakes the streams just
+    the same and keeps the job_events cache from growing with every job.
+    """
+    job_id = instance.id
+    if instance.status in AutomationJob.FINISHED_STATUSES:
+        transaction.on_commit(lambda: forget_job_revision(job_id))
+    else:
+        transaction.on_commit(lambda: notify_job_changed(job_id))
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, created, **kwargs):
+    """
+    Log single-object product writes (ViewSet, admin) to the change feed.
+    Bulk writes by sync_products_to_db log their own changes.
+    """
+    record_product_changes('created' if created else 'updated', [instance.id])
+
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance, **kwargs):
+    """
+    Log product deletions to the change feed.
+    """
+    record_product_changes('deleted', [instance.id])
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def user_changed(sender, instance, **kwargs):
+    """
+    Drop the cached user so password changes and deactivations apply at once
+    (in this process; other processes pick them up when their entry expires).
+    """
+    user_cache.invalidate(getattr(instance, api_settings.USER_ID_FIELD))
@@ -2,9 +2,67 @@
 Django-Q background tasks for automation jobs.
 This module serves as the entry point for Django-Q tasks.
 """
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
 from django.utils import timezone
-from api.models import AutomationJob
-from automation.selenium_scraper import fetch_products_from_source, sync_products_to_db
+from api.models import AutomationJob, Product, ProductChange
+from api.product_changes import mark_product_changes_pruned
+from automation.metrics import JobMetrics
+from automation.sources import DEFAULT_SOURCE, get_source
+from automation.sync import cache_product_images as cache_images_of_products, sync_products_to_db
+
+
+class JobSuperseded(Exception):
+    """
+    Raised when another attempt has claimed the job this task is running.
+    """
+
+
+def _claim_job(job_id: int) -> AutomationJob:
+    """
+    Mark the job as running under a new attempt number.
+    
+    Only the latest attempt may write to the job afterwards, so a worker that
+    was presumed dead but is still running can't overwrite a newer attempt.
+    """
+    with transaction.atomic():
+        job = AutomationJob.objects.select_for_update().get(id=job_id)
+        if job.status not in AutomationJob.FINISHED_STATUSES:
+            now = timezone.now()
+            job.status = 'running'
+            job.attempts += 1
+            job.heartbeat_at = now
+            if job.started_at is None:
+                job.started_at = now
+                job.queue_wait_seconds = (now - job.created_at).total_seconds()
+            job.save()
+    return job
+
+
+def _save_claimed_job(job: AutomationJob, attempt: int, update_fields=None):
+    """
+    Save the job if `attempt` still owns it, otherwise raise JobSuperseded.
+    """
+    with transaction.atomic():
+        current = AutomationJob.objects.select_for_update().filter(id=job.id).values_list('attempts', flat=True).first()
+        if current != attempt:
+            raise JobSuperseded(f"Job {job.id} attempt {attempt} was superseded by attempt {current}")
+        job.save(update_fields=update_fields)
+
+
+def _record_job_metrics(job: AutomationJob, metrics: JobMetrics, base: dict):
+    """
+    Add the metrics of the current attempt to those of earlier attempts (not saved).
+    """
+    phase_durations = dict(base['phase_durations'])
+    for phase, seconds in metrics.phase_durations.items():
+        phase_durations[phase] = round(phase_durations.get(phase, 0.0) + seconds, 3)
+    job.phase_durations = phase_durations
+    job.pages_fetched = base['pages_fetched'] + metrics.counters.get('pages_fetched', 0)
+    job.pages_failed = base['pages_failed'] + metrics.counters.get('pages_failed', 0)
 
 
 def run_scrape_products_job(job_id: int):
@@ -15,34 +73,82 @@ def run_scrape_products_job(job_id: int):
         job_id: ID of the AutomationJob instance
         
     This task:
-    1. Sets AutomationJob status to "running"
-    2. Calls fetch_products_from_source()
-    3. Calls sync_products_to_db()
+    1. Claims the job: status "running", new attempt number, queue wait on first run
+    2. Calls fetch_products_from_source() for the source in the job parameters,
+       starting after the checkpointed page
+    3. After each page: syncs that page with sync_products_to_db() and saves a
+       checkpoint (last contiguous completed page, progress, counters, heartbeat)
     4. On success: sets status to "completed" and finished_at timestamp
     5. On exception: sets status to "failed" and saves error_message
+    
+    A retried (Django-Q timeout) or requeued (stale job reaper) task resumes
+    after the last checkpointed page, so long crawls make monotonic progress.
+    A job that has been attempted more than settings.JOB_MAX_ATTEMPTS times is
+    failed instead of run again.
     """
+    # Selenium is only loaded by processes that actually scrape
+    from automation.selenium_scraper import fetch_products_from_source
+    
+    metrics = JobMetrics()
+    attempt = None
     try:
-        # Get the job instance
-        job = AutomationJob.objects.get(id=job_id)
+        job = _claim_job(job_id)
+        if job.status in AutomationJob.FINISHED_STATUSES:
+            print(f"AutomationJob {job_id} already {job.status} - nothing to do")
+            return
+        attempt = job.attempts
         
-        # Set status to running
-        job.status = 'running'
-        job.save()
+        # Counters from earlier attempts, the current attempt adds to them
+        base = {
+            'phase_durations': job.phase_durations or {},
+            'pages_fetched': job.pages_fetched,
+            'pages_failed': job.pages_failed,
+        }
+        if attempt > settings.JOB_MAX_ATTEMPTS:
+            raise Exception(f"Gave up after {settings.JOB_MAX_ATTEMPTS} attempts")
+        source = get_source(job.parameters.get('source', DEFAULT_SOURCE))
+        resume_after = last_page = job.checkpoint.get('last_page', 0)
+        completed_pages = set()
         
-        # Fetch products from source
-        scraped_products = fetch_products_from_source()
+        def on_page(page_num, total_pages, page_products):
+            nonlocal last_page
+            # Sync each page as it comes in, then checkpoint it
+            with metrics.phase('db_sync'):
+                counts = sync_products_to_db(page_products, source=source.name)
+            job.products_created += counts['created']
+            job.products_updated += counts['updated']
+            job.products_unchanged += counts['unchanged']
+            # Pages finish out of order, only checkpoint up to the first gap
+            completed_pages.add(page_num)
+            while last_page + 1 in completed_pages:
+                last_page += 1
+            job.checkpoint = {'last_page': last_page, 'total_pages': total_pages}
+            job.progress = (resume_after + len(completed_pages)) * 100 // total_pages
+            job.heartbeat_at = timezone.now()
+            _record_job_metrics(job, metrics, base)
+            _save_claimed_job(job, attempt)
         
-        # Sync products to database
-        sync_products_to_db(scraped_products)
+        # Fetch products from source, syncing page by page
+        fetch_products_from_source(
+            source=source,
+            page_callback=on_page,
+            metrics=metrics,
+            start_page=resume_after + 1
+        )
         
         # Mark job as completed
         job.status = 'completed'
+        job.progress = 100
         job.finished_at = timezone.now()
-        job.save()
+        _record_job_metrics(job, metrics, base)
+        _save_claimed_job(job, attempt)
         
     except AutomationJob.DoesNotExist:
         # Job doesn't exist - this shouldn't happen but handle gracefully
         print(f"AutomationJob with id {job_id} does not exist")
+    except JobSuperseded as e:
+        # A newer attempt owns the job now, leave it alone
+        print(str(e))
     except Exception as e:
         # Handle any errors during scraping
         try:
@@ -50,7 +156,120 @@ def run_scrape_products_job(job_id: int):
             job.status = 'failed'
             job.finished_at = timezone.now()
             job.error_message = str(e)
-            job.save()
-        except AutomationJob.DoesNotExist:
+            if attempt is None:
+                job.save()
+            else:
+                _record_job_metrics(job, metrics, base)
+                _save_claimed_job(job, attempt)
+        except (AutomationJob.DoesNotExist, JobSuperseded):
             print(f"Error updating job {job_id}: {e}")
 
+
+def cache_product_images(product_ids):
+    """
+    Django-Q task downloading the images of synced products into the local
+    image cache. Queued by sync_products_to_db once the products are
+    committed; products cached in the meantime are skipped.
+    
+    Returns:
+        Dict with the number of products whose image was cached and failed
+    """
+    products = list(
+        Product.objects
+        .filter(id__in=product_ids, image_hash='', image_url__isnull=False)
+        .exclude(image_url='')
+        .only('id', 'image_url')
+    )
+    return cache_images_of_products(products)
+
+
+def reap_stale_jobs():
+    """
+    Django-Q task requeueing running jobs whose worker stopped sending
+    heartbeats for settings.JOB_STALE_SECONDS (killed on timeout, crashed,
+    recycled). The requeued task resumes from the job's checkpoint; jobs out
+    of attempts are failed instead.
+    
+    Scheduled every few minutes by the setup_schedules management command.
+    
+    Returns:
+        Dict with the number of requeued and failed jobs
+    """
+    from api.job_queue import queue_job_task
+    
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=settings.JOB_STALE_SECONDS)
+    result = {'requeued': 0, 'failed': 0}
+    
+    for job in AutomationJob.objects.filter(status='running', heartbeat_at__lt=cutoff):
+        if job.attempts >= settings.JOB_MAX_ATTEMPTS:
+            job.status = 'failed'
+            job.finished_at = now
+            job.error_message = f"Worker stopped responding, gave up after {job.attempts} attempts"
+            job.save()
+            result['failed'] += 1
+        else:
+            # Push the heartbeat forward so the job isn't requeued again
+            # before the new task had a chance to claim it
+            job.heartbeat_at = now
+            job.save(update_fields=['heartbeat_at', 'updated_at'])
+            queue_job_task(job)
+            result['requeued'] += 1
+    
+    return result
+
+
+def _delete_in_chunks(queryset, batch_size: int) -> int:
+    """
+    Delete the rows of a queryset in primary-key chunks so that no single
+    statement holds locks on a large part of the table.
+    
+    Returns:
+        Number of deleted rows
+    """
+    deleted = 0
+    while True:
+        ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        count, _ = queryset.model.objects.filter(pk__in=ids).delete()
+        deleted += count
+
+
+def prune_old_jobs():
+    """
+    Django-Q task deleting finished AutomationJob rows and Django-Q task
+    results older than settings.JOB_RETENTION_DAYS, and product change log
+    entries older than settings.PRODUCT_CHANGES_RETENTION_DAYS.
+    
+    Queued and running jobs are never deleted. Scheduled daily by the
+    setup_schedules management command.
+    
+    Returns:
+        Dict with the number of deleted jobs, task rows and product changes
+    """
+    from django_q.models import Task
+    
+    cutoff = timezone.now() - timedelta(days=settings.JOB_RETENTION_DAYS)
+    batch_size = settings.JOB_RETENTION_BATCH_SIZE
+    
+    old_jobs = AutomationJob.objects.filter(
+        created_at__lt=cutoff,
+        status__in=AutomationJob.FINISHED_STATUSES
+    )
+    old_tasks = Task.objects.filter(stopped__lt=cutoff)
+    
+    # Change entries are pruned as a prefix of the sequence, up to the last
+    # one logged before the cutoff, and that watermark is recorded
+    changes_cutoff = timezone.now() - timedelta(days=settings.PRODUCT_CHANGES_RETENTION_DAYS)
+    prune_through = ProductChange.objects.filter(changed_at__lt=changes_cutoff).aggregate(Max('id'))['id__max']
+    pruned_changes = 0
+    if prune_through is not None:
+        mark_product_changes_pruned(prune_through)
+        pruned_changes = _delete_in_chunks(ProductChange.objects.filter(id__lte=prune_through), batch_size)
+    
+    return {
+        'jobs': _delete_in_chunks(old_jobs, batch_size),
+        'tasks': _delete_in_chunks(old_tasks, batch_size),
+        'product_changes': pruned_changes,
+    }
@@ -0,0 +1,5 @@
+# Per-test caches: the default FileBasedCache is shared with the dev server
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'job_events': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'job-events'},
+}
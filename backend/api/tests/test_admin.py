@@ -0,0 +1,71 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api.admin import ProductAdmin
+from api.models import Product
+
+
+@mock.patch.object(ProductAdmin, 'list_per_page', 2)
+class KeysetPaginationTests(TestCase):
+    url = '/admin/api/product/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = get_user_model().objects.create_superuser('admin', password='secret')
+        now = timezone.now()
+        # Ties on last_updated and timestamps a microsecond apart
+        offsets = [0, 0, 1, 1, 2]
+        for i, offset in enumerate(offsets):
+            product = Product.objects.create(name=f'P{i}', price=Decimal('1.00'), rating=i % 2, stock=i * 3 % 4)
+            Product.objects.filter(id=product.id).update(last_updated=now - timedelta(microseconds=offset))
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def walk(self, params=None):
+        pages = []
+        params = dict(params or {})
+        while True:
+            changelist = self.client.get(self.url, params).context['cl']
+            self.assertTrue(changelist.keyset)
+            pages.append([product.id for product in changelist.result_list])
+            if not changelist.next_cursor:
+                return pages
+            params['cursor'] = changelist.next_cursor
+
+    def test_pages_cover_every_row_once_in_order(self):
+        pages = self.walk()
+        expected = list(Product.objects.order_by('-last_updated', '-id').values_list('id', flat=True))
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_cursor_keeps_filters(self):
+        pages = self.walk({'rating': 1})
+        expected = list(Product.objects.filter(rating=1).order_by('-last_updated', '-id').values_list('id', flat=True))
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_stock_filter(self):
+        in_stock = sum(self.walk({'stock': 1}), [])
+        out_of_stock = sum(self.walk({'stock': 0}), [])
+        self.assertEqual(set(in_stock), set(Product.objects.filter(stock__gt=0).values_list('id', flat=True)))
+        self.assertEqual(set(out_of_stock), set(Product.objects.filter(stock=0).values_list('id', flat=True)))
+        self.assertEqual(len(in_stock), 3)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertRedirects(response, f'{self.url}?e=1', fetch_redirect_response=False)
+
+    def test_manual_sort_falls_back_to_pages(self):
+        changelist = self.client.get(self.url, {'o': '1'}).context['cl']
+        self.assertFalse(changelist.keyset)
+
+    @override_settings(ADMIN_EXACT_COUNT_LIMIT=3)
+    def test_filtered_count_is_capped(self):
+        changelist = self.client.get(self.url, {'rating': 0}).context['cl']
+        self.assertEqual(changelist.result_count, 3)
+        self.assertTrue(changelist.paginator.count_is_capped)
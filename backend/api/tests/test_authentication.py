@@ -0,0 +1,49 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import CachedJWTAuthentication, user_cache
+
+
+class CachedJWTAuthenticationTests(TestCase):
+
+    def setUp(self):
+        user_cache.clear()
+        self.addCleanup(user_cache.clear)
+        self.user = get_user_model().objects.create_user('alice', password='secret')
+        self.token = AccessToken.for_user(self.user)
+        self.auth = CachedJWTAuthentication()
+
+    def test_user_is_queried_once(self):
+        with self.assertNumQueries(1):
+            self.auth.get_user(self.token)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.auth.get_user(self.token).pk, self.user.pk)
+
+    def test_each_request_gets_its_own_copy(self):
+        first = self.auth.get_user(self.token)
+        first.username = 'mallory'
+        second = self.auth.get_user(self.token)
+        self.assertIsNot(first, second)
+        self.assertEqual(second.username, 'alice')
+
+    def test_deactivation_invalidates_cache(self):
+        self.auth.get_user(self.token)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.get_user(self.token)
+
+    def test_password_change_revokes_cached_token(self):
+        # simplejwt modules hold on to the settings object, patch it in place
+        with mock.patch.object(api_settings, 'CHECK_REVOKE_TOKEN', True):
+            token = AccessToken.for_user(self.user)
+            self.auth.get_user(token)
+            self.user.set_password('changed')
+            self.user.save()
+            with self.assertRaises(AuthenticationFailed):
+                self.auth.get_user(token)
@@ -0,0 +1,119 @@
+import os
+import tempfile
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.test import Client, TestCase, override_settings
+
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.models import Product
+from core.db_routing import (
+    PRIMARY, REPLICA, STICKY_COOKIE, PrimaryReplicaRouter, RequestRouting, _request_routing,
+)
+from . import LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ReplicaRoutingTests(TestCase):
+    """
+    Runs against a second SQLite database standing in for the replica, with
+    rows the primary doesn't have, to see where each read goes. The replica
+    only exists for this class: it is added before TestCase resolves
+    '__all__' and wraps every database in a transaction.
+    """
+    databases = '__all__'
+    url = '/api/products/'
+
+    @classmethod
+    def setUpClass(cls):
+        cls.replica_dir = tempfile.TemporaryDirectory()
+        # connections.settings is settings.DATABASES, which the router checks
+        connections.settings[REPLICA] = {
+            **connections[PRIMARY].settings_dict,
+            'NAME': os.path.join(cls.replica_dir.name, 'replica.sqlite3'),
+        }
+        with connections[REPLICA].schema_editor() as editor:
+            editor.create_model(Product)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+        cls.replica_dir.cleanup()
+
+    def setUp(self):
+        cache.clear()
+        Product.objects.create(name='On primary', price=Decimal('1.00'))
+        Product.objects.using(REPLICA).create(name='On replica', price=Decimal('1.00'))
+
+    def names(self, response):
+        return {product['name'] for product in response.json()}
+
+    def test_reads_use_replica(self):
+        response = self.client.get(self.url)
+        self.assertEqual(self.names(response), {'On replica'})
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+
+    def create(self, client, **extra):
+        response = client.post(
+            self.url, {'name': 'New', 'price': '2.00', 'url': 'https://example.com/new'},
+            content_type='application/json', **extra,
+        )
+        self.assertEqual(response.status_code, 201)
+        return response
+
+    def test_write_pins_client_to_primary(self):
+        created = self.create(self.client)
+        self.assertIn(STICKY_COOKIE, created.cookies)
+        # The test client sends the cookie back
+        self.assertEqual(self.names(self.client.get(self.url)), {'On primary', 'New'})
+
+    def test_pin_holds_without_cookies(self):
+        # Cross-origin clients don't send the cookie back
+        self.create(Client(), REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(self.names(Client().get(self.url, REMOTE_ADDR='10.0.0.1')), {'On primary', 'New'})
+        self.assertEqual(self.names(Client().get(self.url, REMOTE_ADDR='10.0.0.2')), {'On replica'})
+
+    def test_pin_follows_authorization(self):
+        user = get_user_model().objects.create_user('alice')
+        token_a, token_b = (f'Bearer {AccessToken.for_user(user)}' for _ in range(2))
+        self.assertNotEqual(token_a, token_b)
+        self.create(Client(), HTTP_AUTHORIZATION=token_a, REMOTE_ADDR='10.0.0.1')
+        # Same token from another address is pinned, another token isn't
+        pinned = Client().get(self.url, HTTP_AUTHORIZATION=token_a, REMOTE_ADDR='10.0.0.9')
+        self.assertEqual(self.names(pinned), {'On primary', 'New'})
+        other = Client().get(self.url, HTTP_AUTHORIZATION=token_b, REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(self.names(other), {'On replica'})
+
+    async def test_async_stack(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(self.names(response), {'On replica'})
+
+    def test_reads_outside_requests_use_primary(self):
+        self.assertEqual(list(Product.objects.values_list('name', flat=True)), ['On primary'])
+
+    def test_locking_read_does_not_pin(self):
+        routing = RequestRouting(replica_reads=True)
+        token = _request_routing.set(routing)
+        try:
+            with transaction.atomic():
+                list(Product.objects.select_for_update())
+            self.assertFalse(routing.wrote)
+            self.assertEqual(PrimaryReplicaRouter().db_for_read(Product), REPLICA)
+
+            Product.objects.filter(name='On primary').update(stock=0)
+            self.assertTrue(routing.wrote)
+            self.assertEqual(PrimaryReplicaRouter().db_for_read(Product), PRIMARY)
+        finally:
+            _request_routing.reset(token)
+
+    def test_replica_is_never_migrated(self):
+        router = PrimaryReplicaRouter()
+        self.assertFalse(router.allow_migrate(REPLICA, 'api', 'product'))
+        self.assertIsNone(router.allow_migrate(PRIMARY, 'api', 'product'))
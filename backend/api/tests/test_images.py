@@ -0,0 +1,109 @@
+import hashlib
+import os
+import socket
+import tempfile
+from decimal import Decimal
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from api.models import Product, ProductChange
+from automation.images import fetch_image, get_image_path, sniff_content_type, store_image
+from automation.sync import cache_product_images, sync_products_to_db
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 32
+
+
+class ImageStoreTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        override = override_settings(IMAGE_CACHE_DIR=directory.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_sniff_content_type(self):
+        self.assertEqual(sniff_content_type(PNG), 'image/png')
+        self.assertEqual(sniff_content_type(b'\xff\xd8\xff\xe0rest'), 'image/jpeg')
+        self.assertEqual(sniff_content_type(b'RIFF\x00\x00\x00\x00WEBPVP8 '), 'image/webp')
+        self.assertIsNone(sniff_content_type(b'<html>'))
+
+    def test_identical_content_is_stored_once(self):
+        image_hash = store_image(PNG)
+        self.assertEqual(image_hash, hashlib.sha256(PNG).hexdigest())
+        self.assertEqual(store_image(PNG), image_hash)
+
+        path = get_image_path(image_hash)
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), PNG)
+        self.assertEqual(os.listdir(os.path.dirname(path)), [image_hash])
+
+    def test_invalid_hash_is_rejected(self):
+        with self.assertRaises(ValueError):
+            get_image_path('../etc/passwd')
+
+
+class FetchImageTests(SimpleTestCase):
+
+    @mock.patch('automation.images.socket.create_connection')
+    def test_only_public_http_urls_are_fetched(self, create_connection):
+        for url in ('file:///etc/passwd', 'ftp://example.com/a.png', 'http://127.0.0.1/a.png',
+                    'http://[::1]/a.png', 'http://169.254.169.254/latest/meta-data/', 'http://10.0.0.5/a.png'):
+            with self.subTest(url=url):
+                self.assertIsNone(fetch_image(url))
+        create_connection.assert_not_called()
+
+    @mock.patch('automation.images.socket.create_connection')
+    @mock.patch('automation.images.socket.getaddrinfo')
+    def test_host_resolving_to_private_address_is_refused(self, getaddrinfo, create_connection):
+        getaddrinfo.return_value = [(socket.AF_INET, socket.SOCK_STREAM, 6, '', ('192.168.1.10', 80))]
+        self.assertIsNone(fetch_image('http://images.example.com/a.png'))
+        create_connection.assert_not_called()
+
+
+@override_settings(IMAGE_CACHE_ENABLED=True)
+class ProductImageCachingTests(TestCase):
+
+    def scraped(self, name):
+        return {
+            'name': name, 'price': '1.00', 'rating': 3, 'stock': 1,
+            'image_url': f'https://example.com/{name}.jpg', 'source_url': f'https://example.com/{name}',
+        }
+
+    @mock.patch('django_q.tasks.async_task')
+    def test_sync_queues_downloads_after_commit(self, async_task):
+        with self.captureOnCommitCallbacks() as callbacks:
+            counts = sync_products_to_db([self.scraped('A'), self.scraped('B')])
+        async_task.assert_not_called()
+        self.assertEqual(counts['images_queued'], 2)
+
+        for callback in callbacks:
+            callback()
+        ids = list(Product.objects.order_by('id').values_list('id', flat=True))
+        async_task.assert_called_once_with('api.tasks.cache_product_images', ids)
+
+    @override_settings(IMAGE_CACHE_ENABLED=False)
+    @mock.patch('django_q.tasks.async_task')
+    def test_nothing_queued_when_disabled(self, async_task):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            counts = sync_products_to_db([self.scraped('A')])
+        self.assertEqual(counts['images_queued'], 0)
+        self.assertEqual(callbacks, [])
+        async_task.assert_not_called()
+
+    @mock.patch('automation.sync.cache_images')
+    def test_cached_hashes_are_stored_and_logged(self, cache_images):
+        kept = Product.objects.create(name='A', price=Decimal('1.00'), image_url='https://example.com/a.jpg')
+        edited = Product.objects.create(name='B', price=Decimal('1.00'), image_url='https://example.com/b.jpg')
+        products = list(Product.objects.order_by('id'))
+        # image_url edited while the download ran
+        Product.objects.filter(id=edited.id).update(image_url='https://example.com/new.jpg')
+        cache_images.return_value = {'https://example.com/a.jpg': 'a' * 64, 'https://example.com/b.jpg': 'b' * 64}
+
+        self.assertEqual(cache_product_images(products), {'cached': 1, 'failed': 1})
+        kept.refresh_from_db()
+        edited.refresh_from_db()
+        self.assertEqual(kept.image_hash, 'a' * 64)
+        self.assertEqual(edited.image_hash, '')
+        self.assertEqual(ProductChange.objects.filter(action='updated').get().product_id, kept.id)
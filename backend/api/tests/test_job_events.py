@@ -0,0 +1,78 @@
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from api.job_events import (
+    REVISION_MISSING, JobChangeHub, _revision_key, aget_job_revision, notify_job_changed,
+)
+from api.models import AutomationJob
+from api.views import AutomationJobEventsView
+from . import LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES, JOB_EVENTS_POLL_INTERVAL=0.01, JOB_EVENTS_HEARTBEAT=0.05)
+class JobChangeHubTests(TestCase):
+
+    async def test_change_returns_new_revision(self):
+        await caches['job_events'].aset(_revision_key(1), 1)
+        hub = JobChangeHub(poll_interval=0.01)
+        await caches['job_events'].aset(_revision_key(1), 2)
+        self.assertEqual(await hub.wait_for_change(1, 1, timeout=1), 2)
+
+    async def test_timeout_without_change(self):
+        hub = JobChangeHub(poll_interval=0.01)
+        self.assertIsNone(await hub.wait_for_change(1, None, timeout=0.05))
+
+    async def test_lost_revision_is_reported(self):
+        await caches['job_events'].aset(_revision_key(1), 1)
+        hub = JobChangeHub(poll_interval=0.01)
+        await caches['job_events'].adelete(_revision_key(1))
+        self.assertIs(await hub.wait_for_change(1, 1, timeout=1), REVISION_MISSING)
+
+    async def test_stream_recovers_from_lost_revision(self):
+        job = await AutomationJob.objects.acreate(job_type='scrape_products', status='running')
+        revision = await aget_job_revision(job.id)
+        stream = AutomationJobEventsView()._stream(job, revision)
+        self.assertIn('"running"', await anext(stream))
+
+        # Finish the job without a notification and lose its revision
+        await AutomationJob.objects.filter(id=job.id).aupdate(status='completed')
+        await caches['job_events'].adelete(_revision_key(job.id))
+
+        events = [event async for event in stream]
+        self.assertIn('"completed"', events[-1])
+
+    async def test_stream_without_revision_sees_job_finish(self):
+        job = await AutomationJob.objects.acreate(job_type='scrape_products', status='running')
+        await caches['job_events'].adelete(_revision_key(job.id))
+        stream = AutomationJobEventsView()._stream(job, None)
+        await anext(stream)
+
+        await AutomationJob.objects.filter(id=job.id).aupdate(status='failed')
+        events = [event async for event in stream]
+        self.assertIn('"failed"', events[-1])
+
+    def test_notify_uses_job_events_cache(self):
+        notify_job_changed(5)
+        self.assertIsNotNone(caches['job_events'].get(_revision_key(5)))
+        self.assertIsNone(caches['default'].get(_revision_key(5)))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class JobSavedSignalTests(TestCase):
+
+    def setUp(self):
+        caches['job_events'].clear()
+
+    def test_notify_waits_for_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            job = AutomationJob.objects.create(job_type='scrape_products')
+            self.assertIsNone(caches['job_events'].get(_revision_key(job.id)))
+        self.assertIsNotNone(caches['job_events'].get(_revision_key(job.id)))
+
+    def test_finished_job_drops_revision(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            job = AutomationJob.objects.create(job_type='scrape_products', status='running')
+        with self.captureOnCommitCallbacks(execute=True):
+            job.status = 'completed'
+            job.save()
+        self.assertIsNone(caches['job_events'].get(_revision_key(job.id)))
@@ -0,0 +1,109 @@
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django_q.models import Task
+
+from api.models import AutomationJob
+from api.tasks import prune_old_jobs
+
+
+def create_job(status='completed', created_at=None, job_type='scrape_products'):
+    job = AutomationJob.objects.create(job_type=job_type, status=status)
+    if created_at is not None:
+        AutomationJob.objects.filter(id=job.id).update(created_at=created_at)
+    return job
+
+
+class AutomationJobListTests(TestCase):
+    url = '/api/automation/jobs/'
+
+    def ids(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [job['id'] for job in response.json()['results']]
+
+    def test_status_filter(self):
+        completed = create_job('completed')
+        create_job('failed')
+        self.assertEqual(self.ids(self.client.get(self.url, {'status': 'completed'})), [completed.id])
+
+    def test_date_filters(self):
+        day = datetime(2024, 5, 10, tzinfo=dt_timezone.utc)
+        before = create_job(created_at=day - timedelta(hours=1))
+        during = create_job(created_at=day + timedelta(hours=12))
+        after = create_job(created_at=day + timedelta(days=1))
+
+        self.assertEqual(
+            self.ids(self.client.get(self.url, {'created_after': '2024-05-10', 'created_before': '2024-05-11'})),
+            [during.id]
+        )
+        self.assertEqual(self.ids(self.client.get(self.url, {'created_after': '2024-05-10T12:00:00Z'})),
+                         [after.id, during.id])
+        self.assertEqual(self.ids(self.client.get(self.url, {'created_before': '2024-05-10'})), [before.id])
+
+    def test_invalid_params_are_rejected(self):
+        for params in ({'status': 'done'}, {'job_type': 'nope'}, {'created_after': 'yesterday'},
+                       {'created_before': '2024-13-40'}):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('detail', response.json())
+
+    def test_cursor_pages_cover_every_job_once(self):
+        now = timezone.now()
+        jobs = [create_job(created_at=now - timedelta(minutes=i)) for i in range(5)]
+        pages = []
+        response = self.client.get(self.url, {'page_size': 2})
+        while True:
+            pages.append(self.ids(response))
+            if not response.json()['next']:
+                break
+            response = self.client.get(response.json()['next'])
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(sum(pages, []), [job.id for job in jobs])
+
+    def test_filters_hold_across_pages(self):
+        now = timezone.now()
+        failed = [create_job('failed', now - timedelta(minutes=i)) for i in range(3)]
+        create_job('completed', now)
+        first = self.client.get(self.url, {'status': 'failed', 'page_size': 2})
+        second = self.client.get(first.json()['next'])
+        self.assertEqual(self.ids(first) + self.ids(second), [job.id for job in failed])
+
+
+@override_settings(JOB_RETENTION_DAYS=30, JOB_RETENTION_BATCH_SIZE=2)
+class PruneOldJobsTests(TestCase):
+
+    def create_task(self, stopped):
+        return Task.objects.create(
+            id=uuid.uuid4().hex, name=uuid.uuid4().hex, func='api.tasks.run_scrape_products_job',
+            started=stopped, stopped=stopped, success=True,
+        )
+
+    def test_old_finished_jobs_and_tasks_are_deleted(self):
+        old = timezone.now() - timedelta(days=31)
+        recent = timezone.now() - timedelta(days=1)
+        for status in ('completed', 'failed', 'completed'):
+            create_job(status, old)
+        kept = {
+            create_job('completed', recent).id,
+            # Unfinished jobs stay however old they are
+            create_job('running', old).id,
+            create_job('queued', old).id,
+        }
+        for _ in range(3):
+            self.create_task(old)
+        recent_task = self.create_task(recent)
+
+        result = prune_old_jobs()
+
+        self.assertEqual(result['jobs'], 3)
+        self.assertEqual(result['tasks'], 3)
+        self.assertEqual(set(AutomationJob.objects.values_list('id', flat=True)), kept)
+        self.assertEqual(list(Task.objects.values_list('id', flat=True)), [recent_task.id])
+
+    def test_nothing_to_prune(self):
+        create_job('completed')
+        self.assertEqual(prune_old_jobs(), {'jobs': 0, 'tasks': 0, 'product_changes': 0})
+        self.assertEqual(AutomationJob.objects.count(), 1)
@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from api.job_metrics import percentile, summarize_job_metrics
+from api.models import AutomationJob
+
+
+def make_job(run_seconds, status='completed', pages_fetched=0, queue_wait=None, phases=None, **counts):
+    finished_at = timezone.now()
+    return AutomationJob(
+        job_type='scrape_products', status=status,
+        started_at=finished_at - timedelta(seconds=run_seconds), finished_at=finished_at,
+        queue_wait_seconds=queue_wait, phase_durations=phases or {}, pages_fetched=pages_fetched, **counts,
+    )
+
+
+class SummarizeJobMetricsTests(SimpleTestCase):
+
+    def test_percentile_is_nearest_rank(self):
+        values = list(range(1, 21))
+        self.assertEqual(percentile(values, 50), 10)
+        self.assertEqual(percentile(values, 95), 19)
+        self.assertEqual(percentile([7.0], 95), 7.0)
+        self.assertIsNone(percentile([], 50))
+
+    def test_known_durations(self):
+        # Run times 1..20 seconds, every fourth job failed
+        jobs = [
+            make_job(
+                seconds, status='failed' if seconds % 4 == 0 else 'completed',
+                pages_fetched=2, queue_wait=seconds / 10,
+                phases={'page_load': seconds / 2}, products_created=1, products_unchanged=20,
+            )
+            for seconds in range(1, 21)
+        ]
+        summary = summarize_job_metrics(jobs)
+
+        self.assertEqual(summary['job_count'], 20)
+        self.assertEqual(summary['run_seconds'], {'count': 20, 'p50': 10, 'p95': 19, 'max': 20})
+        self.assertEqual(summary['queue_wait_seconds']['p50'], 1.0)
+        self.assertEqual(summary['phases']['page_load'], {'count': 20, 'p50': 5.0, 'p95': 9.5, 'max': 10.0})
+        self.assertEqual(summary['failure_rate'], 0.25)
+        # 40 pages and 420 products over 210 seconds of run time
+        self.assertEqual(summary['totals']['pages_fetched'], 40)
+        self.assertEqual(summary['pages_per_second'], round(40 / 210, 3))
+        self.assertEqual(summary['products_per_second'], 2.0)
+
+    def test_empty_window(self):
+        summary = summarize_job_metrics([])
+        self.assertEqual(summary['job_count'], 0)
+        self.assertEqual(summary['run_seconds'], {'count': 0, 'p50': None, 'p95': None, 'max': None})
+        self.assertEqual(summary['phases'], {})
+        self.assertIsNone(summary['failure_rate'])
+        self.assertIsNone(summary['pages_per_second'])
+        self.assertIsNone(summary['products_per_second'])
+
+
+class AutomationJobMetricsViewTests(TestCase):
+    url = '/api/automation/jobs/metrics/'
+
+    def test_only_recent_finished_jobs(self):
+        for seconds in (5, 10):
+            make_job(seconds, pages_fetched=1).save()
+        make_job(30, status='failed').save()
+        AutomationJob.objects.create(job_type='scrape_products', status='running')
+
+        summary = self.client.get(self.url).json()
+        self.assertEqual(summary['job_count'], 3)
+        self.assertEqual(summary['run_seconds']['max'], 30)
+        self.assertEqual(summary['failure_rate'], 0.333)
+
+        # The most recent two: the failed job and the 10s one
+        summary = self.client.get(self.url, {'limit': 2}).json()
+        self.assertEqual(summary['job_count'], 2)
+        self.assertEqual(summary['failure_rate'], 0.5)
+        self.assertEqual(summary['pages_per_second'], round(1 / 40, 3))
+
+    def test_empty_window(self):
+        summary = self.client.get(self.url).json()
+        self.assertEqual(summary['job_count'], 0)
+        self.assertIsNone(summary['failure_rate'])
+
+    def test_invalid_limit(self):
+        self.assertEqual(self.client.get(self.url, {'limit': 'ten'}).status_code, 400)
@@ -0,0 +1,85 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from api.job_queue import enqueue_job
+from api.models import AutomationJob
+from . import LOCMEM_CACHES
+
+
+@mock.patch('django_q.tasks.async_task')
+class EnqueueJobTests(TestCase):
+
+    def test_identical_jobs_are_coalesced(self, async_task):
+        job, created = enqueue_job('scrape_products', {'source': 'books_toscrape'})
+        same, same_created = enqueue_job('scrape_products', {'source': 'books_toscrape'})
+        self.assertTrue(created)
+        self.assertFalse(same_created)
+        self.assertEqual(same.id, job.id)
+        async_task.assert_called_once()
+
+    def test_different_parameters_are_separate_jobs(self, async_task):
+        first, _ = enqueue_job('scrape_products', {'source': 'a'})
+        second, created = enqueue_job('scrape_products', {'source': 'b'})
+        self.assertTrue(created)
+        self.assertNotEqual(first.id, second.id)
+
+    def test_force_queues_a_new_job(self, async_task):
+        job, _ = enqueue_job('scrape_products', {'source': 'books_toscrape'})
+        forced, created = enqueue_job('scrape_products', {'source': 'books_toscrape'}, force=True)
+        self.assertTrue(created)
+        self.assertNotEqual(forced.id, job.id)
+        # The forced job doesn't take over the key, later requests still join the first
+        self.assertIsNone(forced.active_key)
+        self.assertEqual(enqueue_job('scrape_products', {'source': 'books_toscrape'})[0].id, job.id)
+        self.assertEqual(async_task.call_count, 2)
+
+    def test_finished_job_releases_key(self, async_task):
+        job, _ = enqueue_job('scrape_products', {'source': 'books_toscrape'})
+        job.status = 'completed'
+        job.save()
+        new, created = enqueue_job('scrape_products', {'source': 'books_toscrape'})
+        self.assertTrue(created)
+        self.assertNotEqual(new.id, job.id)
+
+    def test_failed_queueing_releases_key(self, async_task):
+        async_task.side_effect = RuntimeError('broker down')
+        with self.assertRaises(RuntimeError):
+            enqueue_job('scrape_products', {'source': 'books_toscrape'})
+        job = AutomationJob.objects.get()
+        self.assertEqual(job.status, 'failed')
+        self.assertIsNone(job.active_key)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+@mock.patch('api.throttling.get_queue_depth', return_value=0)
+@mock.patch('django_q.tasks.async_task')
+class ScrapeProductsViewTests(TestCase):
+    url = '/api/automation/scrape-products/'
+
+    def setUp(self):
+        cache.clear()
+
+    def test_duplicate_request_joins_active_job(self, async_task, get_queue_depth):
+        first = self.client.post(self.url, {'sources': ['books_toscrape']}, content_type='application/json')
+        second = self.client.post(self.url, {'sources': ['books_toscrape']}, content_type='application/json')
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 200)
+        self.assertTrue(second.json()['coalesced'])
+        self.assertEqual(second.json()['job_id'], first.json()['job_id'])
+
+    def test_force(self, async_task, get_queue_depth):
+        first = self.client.post(self.url, {'sources': ['books_toscrape']}, content_type='application/json')
+        forced = self.client.post(
+            self.url, {'sources': ['books_toscrape'], 'force': True}, content_type='application/json'
+        )
+        self.assertEqual(forced.status_code, 201)
+        self.assertNotEqual(forced.json()['job_id'], first.json()['job_id'])
+
+    def test_invalid_bodies_are_rejected(self, async_task, get_queue_depth):
+        for body in ([1, 2], {'sources': 5}, {'sources': [1]}, {'sources': ['nope']}):
+            with self.subTest(body=body):
+                response = self.client.post(self.url, body, content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+        async_task.assert_not_called()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from api.middleware import _install_query_wrapper, _profile_query, _profiler_lock
+from api.models import Product
+
+
+def server_timing(response):
+    timings = {}
+    for entry in response['Server-Timing'].split(', '):
+        name, duration = entry.split(';')[:2]
+        timings[name] = float(duration[len('dur='):])
+    return timings
+
+
+@override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=0)
+class ProfilingMiddlewareTests(TestCase):
+    url = '/api/products/'
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(3):
+            Product.objects.create(name=f'P{i}', price=Decimal('1.00'))
+
+    def test_headers(self):
+        response = self.client.get(self.url)
+        timings = server_timing(response)
+        self.assertEqual(set(timings), {'db', 'serializer', 'view', 'total'})
+        # The view span excludes the DB and serializer spans
+        self.assertLessEqual(timings['view'], timings['total'] - timings['serializer'] + 0.1)
+        self.assertGreater(int(response['X-Query-Count']), 0)
+
+    def setUp(self):
+        # The test database connection was opened before the middleware loaded
+        _install_query_wrapper(None, connection)
+        self.addCleanup(connection.execute_wrappers.remove, _profile_query)
+
+    async def test_async_stack_counts_queries(self):
+        response = await self.async_client.get(self.url)
+        self.assertIn('total;dur=', response['Server-Timing'])
+        self.assertGreater(int(response['X-Query-Count']), 0)
+
+    def test_sampling_skips_while_another_profile_runs(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with self.settings(PROFILING_SAMPLE_RATE=1, PROFILING_SLOW_REQUEST_MS=0, PROFILING_DUMP_DIR=directory):
+                with _profiler_lock:
+                    self.assertEqual(self.client.get(self.url).status_code, 200)
+                self.assertFalse(os.path.exists(directory) and os.listdir(directory))
+
+                self.client.get(self.url)
+                self.assertEqual(len(os.listdir(directory)), 1)
+            self.assertFalse(_profiler_lock.locked())
@@ -0,0 +1,93 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api.models import Product, ProductChange, ProductChangeSequence
+from api.product_changes import record_product_changes
+from api.tasks import prune_old_jobs
+from automation.sync import sync_products_to_db
+
+
+def scraped(name, price='1.00'):
+    return {
+        'name': name, 'price': price, 'rating': 3, 'stock': 1,
+        'image_url': f'https://example.com/{name}.jpg', 'source_url': f'https://example.com/{name}',
+    }
+
+
+@override_settings(IMAGE_CACHE_ENABLED=False)
+class ProductChangeFeedTests(TestCase):
+    url = '/api/products/changes/'
+
+    def test_sequence_numbers_are_contiguous(self):
+        record_product_changes('created', [1, 2])
+        record_product_changes('updated', [1])
+        self.assertEqual(list(ProductChange.objects.values_list('id', flat=True)), [1, 2, 3])
+        self.assertEqual(ProductChangeSequence.objects.get(pk=1).last_seq, 3)
+
+    def test_sync_and_api_writes_are_logged(self):
+        sync_products_to_db([scraped('A'), scraped('B')])
+        sync_products_to_db([scraped('A', '2.00'), scraped('B')])
+        product = Product.objects.create(name='Manual', price=Decimal('1.00'), url='https://example.com/m')
+        self.client.delete(f'/api/products/{product.id}/')
+
+        actions = list(ProductChange.objects.values_list('action', flat=True))
+        self.assertEqual(actions, ['created', 'created', 'updated', 'created', 'deleted'])
+
+    def test_cursor_returns_each_change_once(self):
+        sync_products_to_db([scraped('A'), scraped('B')])
+        first = self.client.get(self.url).json()
+        self.assertEqual({change['product']['name'] for change in first['changes']}, {'A', 'B'})
+        self.assertEqual(first['next'], 2)
+        self.assertEqual(first['latest'], 2)
+
+        sync_products_to_db([scraped('A', '5.00'), scraped('B')])
+        second = self.client.get(self.url, {'since': first['next']}).json()
+        self.assertEqual(
+            [(change['action'], change['product']['name'], change['product']['price']) for change in second['changes']],
+            [('updated', 'A', '5.00')],
+        )
+        self.assertFalse(second['has_more'])
+
+        empty = self.client.get(self.url, {'since': second['next']}).json()
+        self.assertEqual(empty['changes'], [])
+        self.assertEqual(empty['next'], second['next'])
+
+    def test_limit_pages_through_changes(self):
+        sync_products_to_db([scraped(name) for name in 'ABC'])
+        page = self.client.get(self.url, {'limit': 2}).json()
+        self.assertEqual(len(page['changes']), 2)
+        self.assertTrue(page['has_more'])
+        rest = self.client.get(self.url, {'since': page['next'], 'limit': 2}).json()
+        self.assertEqual(len(rest['changes']), 1)
+        self.assertFalse(rest['has_more'])
+
+    def test_deleted_product_has_no_data(self):
+        product = Product.objects.create(name='Gone', price=Decimal('1.00'), url='https://example.com/g')
+        product_id = product.id
+        product.delete()
+        changes = self.client.get(self.url).json()['changes']
+        self.assertEqual(changes, [{'seq': 2, 'action': 'deleted', 'product_id': product_id, 'product': None}])
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.url, {'since': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'since': -1}).status_code, 400)
+
+    def test_pruned_cursor_is_gone(self):
+        record_product_changes('created', [1, 2, 3])
+        ProductChange.objects.filter(id__lte=2).update(changed_at=timezone.now() - timedelta(days=365))
+        prune_old_jobs()
+
+        self.assertEqual(ProductChangeSequence.objects.get(pk=1).pruned_through, 2)
+        gone = self.client.get(self.url, {'since': 1})
+        self.assertEqual(gone.status_code, 410)
+        self.assertEqual(gone.json()['latest'], 3)
+        self.assertEqual(self.client.get(self.url, {'since': 2}).status_code, 200)
+
+    def test_gaps_in_sequence_are_not_gone(self):
+        # Ids missing without pruning (e.g. rolled back) don't invalidate cursors
+        record_product_changes('created', [1, 2, 3])
+        ProductChange.objects.filter(id__lte=2).delete()
+        self.assertEqual(self.client.get(self.url, {'since': 0}).status_code, 200)
@@ -0,0 +1,95 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django_q.models import Schedule
+
+from api.models import AutomationJob
+from api.scheduler import ensure_sync_schedules, get_next_interval, run_scheduled_sync
+
+INTERVALS = {
+    'SYNC_INITIAL_INTERVAL_MINUTES': 60, 'SYNC_MIN_INTERVAL_MINUTES': 15, 'SYNC_MAX_INTERVAL_MINUTES': 240,
+    'SYNC_BACKOFF_BELOW': 0.02, 'SYNC_TIGHTEN_ABOVE': 0.2, 'SYNC_CHANGE_HISTORY': 2,
+}
+
+
+@override_settings(**INTERVALS)
+class NextIntervalTests(SimpleTestCase):
+
+    def test_backs_off_when_little_changes(self):
+        self.assertEqual(get_next_interval(60, 0.0), 120)
+        self.assertEqual(get_next_interval(60, 0.02), 120)
+
+    def test_tightens_when_a_lot_changes(self):
+        self.assertEqual(get_next_interval(60, 0.2), 30)
+        self.assertEqual(get_next_interval(60, 1.0), 30)
+
+    def test_keeps_interval_in_between_or_without_history(self):
+        self.assertEqual(get_next_interval(60, 0.1), 60)
+        self.assertEqual(get_next_interval(60, None), 60)
+
+    def test_clamped_to_bounds(self):
+        self.assertEqual(get_next_interval(200, 0.0), 240)
+        self.assertEqual(get_next_interval(20, 0.5), 15)
+        self.assertEqual(get_next_interval(1000, None), 240)
+
+
+@override_settings(**INTERVALS)
+@mock.patch('django_q.tasks.async_task')
+class RunScheduledSyncTests(TestCase):
+    source = 'books_toscrape'
+
+    def setUp(self):
+        ensure_sync_schedules()
+        self.schedule = Schedule.objects.get(name=f'sync_{self.source}')
+
+    def add_run(self, created=0, updated=0, unchanged=0):
+        AutomationJob.objects.create(
+            job_type='scrape_products', status='completed', parameters={'source': self.source},
+            products_created=created, products_updated=updated, products_unchanged=unchanged,
+        )
+
+    def run_sync(self):
+        result = run_scheduled_sync(self.source)
+        self.schedule.refresh_from_db()
+        # Leave no active job behind for the next run to join
+        AutomationJob.objects.filter(id=result['job_id']).update(status='failed', active_key=None)
+        return result
+
+    def test_unchanged_runs_back_off(self, async_task):
+        self.add_run(unchanged=100)
+        result = self.run_sync()
+        self.assertEqual(result['change_rate'], 0)
+        self.assertEqual(result['interval_minutes'], 120)
+        self.assertEqual(self.schedule.minutes, 120)
+        self.assertEqual(self.run_sync()['interval_minutes'], 240)
+        # Already at the maximum
+        self.assertEqual(self.run_sync()['interval_minutes'], 240)
+
+    def test_changes_tighten(self, async_task):
+        self.add_run(updated=30, unchanged=70)
+        self.assertEqual(self.run_sync()['interval_minutes'], 30)
+        self.assertEqual(self.run_sync()['interval_minutes'], 15)
+        self.assertEqual(self.run_sync()['interval_minutes'], 15)
+        self.assertEqual(self.schedule.minutes, 15)
+
+    def test_only_recent_runs_count(self, async_task):
+        self.add_run(updated=100)
+        self.add_run(unchanged=100)
+        self.add_run(unchanged=100)
+        self.assertEqual(self.run_sync()['change_rate'], 0)
+
+    def test_coalesced_run_keeps_interval(self, async_task):
+        self.add_run(unchanged=100)
+        job_id = run_scheduled_sync(self.source)['job_id']
+        result = run_scheduled_sync(self.source)
+        self.assertTrue(result['coalesced'])
+        self.assertEqual(result['job_id'], job_id)
+        self.assertEqual(result['interval_minutes'], 120)
+        self.schedule.refresh_from_db()
+        self.assertEqual(self.schedule.minutes, 120)
+        async_task.assert_called_once()
+
+    def test_unknown_source(self, async_task):
+        with self.assertRaises(ValueError):
+            run_scheduled_sync('nope')
+        self.assertFalse(AutomationJob.objects.exists())
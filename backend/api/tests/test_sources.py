@@ -0,0 +1,116 @@
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from api.models import AutomationJob
+from automation.rate_limit import ConcurrencyLimiter, RateLimiter
+from automation.sources import DEFAULT_SOURCE, SOURCES, ScrapeSource, get_source, register_source
+from . import LOCMEM_CACHES
+
+OTHER_SOURCE = ScrapeSource(
+    name='other_shop', listing_urls=['https://shop.example.com/'],
+    parser='automation.selenium_scraper.parse_books_toscrape_page', wait_for_class='product',
+)
+
+
+class SourceRegistryTests(SimpleTestCase):
+
+    def test_default_source_is_registered(self):
+        self.assertEqual(get_source(DEFAULT_SOURCE).name, DEFAULT_SOURCE)
+
+    def test_unknown_source(self):
+        with self.assertRaisesMessage(ValueError, "Unknown source 'nope'"):
+            get_source('nope')
+
+    @mock.patch.dict(SOURCES)
+    def test_register_source(self):
+        self.assertIs(register_source(OTHER_SOURCE), OTHER_SOURCE)
+        self.assertIs(get_source('other_shop'), OTHER_SOURCE)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RateLimiterTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_requests_are_spaced_across_limiters(self):
+        # Two jobs scraping the same source each have their own limiter
+        first, second = RateLimiter('source', 0.2), RateLimiter('source', 0.2)
+        self.assertEqual(first.wait(), 0)
+        self.assertAlmostEqual(second.wait(), 0.2, delta=0.05)
+        self.assertAlmostEqual(first.wait(), 0.2, delta=0.05)
+
+    def test_keys_are_independent(self):
+        RateLimiter('source', 10).wait()
+        self.assertEqual(RateLimiter('other', 10).wait(), 0)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ConcurrencyLimiterTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def enter_in_thread(self, limiter):
+        entered = threading.Event()
+
+        def run():
+            with limiter.slot():
+                entered.set()
+        thread = threading.Thread(target=run)
+        thread.start()
+        self.addCleanup(thread.join)
+        return entered
+
+    def test_slots_are_shared_across_limiters(self):
+        with ConcurrencyLimiter('source', 2).slot(), ConcurrencyLimiter('source', 2).slot():
+            entered = self.enter_in_thread(ConcurrencyLimiter('source', 2))
+            self.assertFalse(entered.wait(0.2))
+        self.assertTrue(entered.wait(1))
+
+    def test_abandoned_slot_expires(self):
+        # A holder that died never releases its slot
+        abandoned = ConcurrencyLimiter('source', 1, lease=0.2).slot()
+        abandoned.__enter__()
+        with ConcurrencyLimiter('source', 1).slot() as waited:
+            self.assertGreater(waited, 0.1)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+@mock.patch.dict(SOURCES, {OTHER_SOURCE.name: OTHER_SOURCE})
+@mock.patch('api.throttling.get_queue_depth', return_value=0)
+@mock.patch('django_q.tasks.async_task')
+class MultiSourceScrapeTests(TestCase):
+    url = '/api/automation/scrape-products/'
+
+    def setUp(self):
+        cache.clear()
+
+    def test_one_job_per_source(self, async_task, get_queue_depth):
+        response = self.client.post(self.url, {}, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        jobs = response.json()['jobs']
+        self.assertEqual([job['source'] for job in jobs], [DEFAULT_SOURCE, 'other_shop'])
+        self.assertEqual(response.json()['job_id'], jobs[0]['job_id'])
+        self.assertEqual(
+            {job.parameters['source'] for job in AutomationJob.objects.all()}, {DEFAULT_SOURCE, 'other_shop'}
+        )
+        self.assertEqual(async_task.call_count, 2)
+
+    def test_selected_sources_only(self, async_task, get_queue_depth):
+        response = self.client.post(self.url, {'sources': 'other_shop'}, content_type='application/json')
+        self.assertEqual([job['source'] for job in response.json()['jobs']], ['other_shop'])
+        self.assertEqual(AutomationJob.objects.get().parameters, {'source': 'other_shop'})
+
+    def test_active_source_is_joined_others_queued(self, async_task, get_queue_depth):
+        first = self.client.post(self.url, {'sources': [DEFAULT_SOURCE]}, content_type='application/json')
+        both = self.client.post(self.url, {}, content_type='application/json')
+        self.assertEqual(both.status_code, 201)
+        self.assertEqual(
+            [(job['source'], job['coalesced']) for job in both.json()['jobs']],
+            [(DEFAULT_SOURCE, True), ('other_shop', False)],
+        )
+        self.assertEqual(both.json()['jobs'][0]['job_id'], first.json()['job_id'])
@@ -0,0 +1,148 @@
+import sys
+import types
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.conf import settings
+from django.db.models import F
+from django.test import TestCase
+from django.utils import timezone
+
+from api.models import AutomationJob, Product
+from api.tasks import reap_stale_jobs, run_scrape_products_job
+
+
+def product(name):
+    return {'name': name, 'price': Decimal('1.00'), 'rating': 3, 'stock': 1,
+            'image_url': None, 'source_url': f'https://example.com/{name}'}
+
+
+class ScrapeJobTests(TestCase):
+    """
+    The scraper module needs Selenium, so the task gets a fake one that
+    reports pages through page_callback.
+    """
+
+    def setUp(self):
+        self.job = AutomationJob.objects.create(job_type='scrape_products', parameters={'source': 'books_toscrape'})
+        self.fetch = mock.Mock()
+        scraper = types.SimpleNamespace(fetch_products_from_source=self.fetch)
+        patcher = mock.patch.dict(sys.modules, {'automation.selenium_scraper': scraper})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def reload(self):
+        self.job.refresh_from_db()
+        return self.job
+
+    def test_pages_are_synced_and_job_completes(self):
+        def fetch(source, page_callback, metrics, start_page):
+            page_callback(1, 2, [product('a'), product('b')])
+            page_callback(2, 2, [product('c')])
+        self.fetch.side_effect = fetch
+
+        run_scrape_products_job(self.job.id)
+
+        job = self.reload()
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(job.products_created, 3)
+        self.assertEqual(job.checkpoint, {'last_page': 2, 'total_pages': 2})
+        self.assertEqual(Product.objects.count(), 3)
+
+    def test_checkpoint_only_covers_contiguous_pages(self):
+        checkpoints = []
+
+        def fetch(source, page_callback, metrics, start_page):
+            for page in (2, 3, 1, 5):
+                page_callback(page, 5, [product(f'p{page}')])
+                checkpoints.append(self.reload().checkpoint['last_page'])
+            raise RuntimeError('browser crashed')
+        self.fetch.side_effect = fetch
+
+        run_scrape_products_job(self.job.id)
+
+        self.assertEqual(checkpoints, [0, 0, 3, 3])
+        job = self.reload()
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(job.error_message, 'browser crashed')
+        self.assertEqual(job.progress, 80)
+
+    def test_resumes_after_checkpoint(self):
+        AutomationJob.objects.filter(id=self.job.id).update(
+            attempts=1, checkpoint={'last_page': 3, 'total_pages': 4}, products_created=3,
+        )
+
+        def fetch(source, page_callback, metrics, start_page):
+            self.assertEqual(start_page, 4)
+            page_callback(4, 4, [product('d')])
+        self.fetch.side_effect = fetch
+
+        run_scrape_products_job(self.job.id)
+
+        job = self.reload()
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(job.products_created, 4)
+        self.assertEqual(job.checkpoint, {'last_page': 4, 'total_pages': 4})
+
+    def test_superseded_attempt_leaves_job_alone(self):
+        def fetch(source, page_callback, metrics, start_page):
+            page_callback(1, 3, [product('a')])
+            # The reaper gave up on this worker and another one claimed the job
+            AutomationJob.objects.filter(id=self.job.id).update(attempts=F('attempts') + 1)
+            page_callback(2, 3, [product('b')])
+        self.fetch.side_effect = fetch
+
+        run_scrape_products_job(self.job.id)
+
+        job = self.reload()
+        self.assertEqual(job.status, 'running')
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(job.checkpoint['last_page'], 1)
+        self.assertIsNone(job.finished_at)
+
+    def test_gives_up_after_max_attempts(self):
+        AutomationJob.objects.filter(id=self.job.id).update(attempts=settings.JOB_MAX_ATTEMPTS)
+
+        run_scrape_products_job(self.job.id)
+
+        job = self.reload()
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(job.error_message, f'Gave up after {settings.JOB_MAX_ATTEMPTS} attempts')
+        self.fetch.assert_not_called()
+
+
+@mock.patch('django_q.tasks.async_task')
+class ReapStaleJobsTests(TestCase):
+
+    def create(self, attempts, heartbeat_age):
+        return AutomationJob.objects.create(
+            job_type='scrape_products', status='running', attempts=attempts,
+            heartbeat_at=timezone.now() - timedelta(seconds=heartbeat_age),
+        )
+
+    def test_stale_jobs_are_requeued_or_failed(self, async_task):
+        stale = self.create(1, settings.JOB_STALE_SECONDS + 60)
+        exhausted = self.create(settings.JOB_MAX_ATTEMPTS, settings.JOB_STALE_SECONDS + 60)
+        alive = self.create(1, 10)
+
+        self.assertEqual(reap_stale_jobs(), {'requeued': 1, 'failed': 1})
+
+        async_task.assert_called_once()
+        self.assertEqual(async_task.call_args.args[1], stale.id)
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, 'running')
+        self.assertGreater(stale.heartbeat_at, timezone.now() - timedelta(seconds=10))
+        exhausted.refresh_from_db()
+        self.assertEqual(exhausted.status, 'failed')
+        self.assertIsNotNone(exhausted.finished_at)
+        alive.refresh_from_db()
+        self.assertEqual(alive.status, 'running')
+
+    def test_requeued_job_is_not_reaped_again(self, async_task):
+        self.create(1, settings.JOB_STALE_SECONDS + 60)
+        reap_stale_jobs()
+        self.assertEqual(reap_stale_jobs(), {'requeued': 0, 'failed': 0})
+        async_task.assert_called_once()
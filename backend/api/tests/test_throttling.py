@@ -0,0 +1,78 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.throttling import SimpleRateThrottle
+
+from api.models import AutomationJob
+from api.throttling import estimate_retry_after
+from . import LOCMEM_CACHES
+
+# Throttle classes read their rates once at import, patch the shared dict
+RATES = {'auth_login': '2/min', 'auth_register': '2/min', 'auth_burst': '4/min', 'scrape': '2/min'}
+
+
+@override_settings(CACHES=LOCMEM_CACHES, SCRAPE_ADMISSION_QUEUE_LIMIT=5)
+@mock.patch.dict(SimpleRateThrottle.THROTTLE_RATES, RATES)
+@mock.patch('django_q.tasks.async_task')
+class ThrottleTests(TestCase):
+    scrape_url = '/api/automation/scrape-products/'
+
+    def setUp(self):
+        cache.clear()
+
+    def login(self, ip='10.0.0.1'):
+        return self.client.post(
+            '/api/auth/login/', {'username': 'x', 'password': 'y'},
+            content_type='application/json', REMOTE_ADDR=ip,
+        )
+
+    def test_login_is_limited_per_client(self, async_task):
+        self.assertEqual([self.login().status_code for _ in range(2)], [401, 401])
+        throttled = self.login()
+        self.assertEqual(throttled.status_code, 429)
+        self.assertGreater(int(throttled['Retry-After']), 0)
+        # Another client still gets through
+        self.assertEqual(self.login('10.0.0.2').status_code, 401)
+
+    def test_burst_limit_spans_clients(self, async_task):
+        statuses = [self.login(f'10.0.0.{i}').status_code for i in range(5)]
+        self.assertEqual(statuses, [401, 401, 401, 401, 429])
+
+    @mock.patch('api.throttling.get_queue_depth', return_value=0)
+    def test_scrape_is_throttled(self, get_queue_depth, async_task):
+        statuses = [self.client.post(self.scrape_url).status_code for _ in range(3)]
+        self.assertEqual(statuses, [201, 200, 429])
+
+    @mock.patch('api.throttling.get_queue_depth', return_value=9)
+    def test_full_queue_refuses_new_work(self, get_queue_depth, async_task):
+        response = self.client.post(self.scrape_url)
+        self.assertEqual(response.status_code, 429)
+        # No completed jobs yet: Q_CLUSTER timeout per job, 4 workers, 5 excess tasks
+        self.assertEqual(response['Retry-After'], '75')
+        self.assertFalse(AutomationJob.objects.exists())
+        async_task.assert_not_called()
+
+    def test_full_queue_still_joins_active_jobs(self, async_task):
+        with mock.patch('api.throttling.get_queue_depth', return_value=0):
+            first = self.client.post(self.scrape_url).json()
+        with mock.patch('api.throttling.get_queue_depth', return_value=9):
+            joined = self.client.post(self.scrape_url)
+        self.assertEqual(joined.status_code, 200)
+        self.assertEqual(joined.json()['job_id'], first['job_id'])
+
+
+@override_settings(SCRAPE_ADMISSION_QUEUE_LIMIT=5)
+class RetryAfterTests(TestCase):
+
+    def test_uses_recent_run_times(self):
+        now = timezone.now()
+        for seconds in (10, 30):
+            AutomationJob.objects.create(
+                job_type='scrape_products', status='completed',
+                started_at=now - timedelta(seconds=seconds), finished_at=now,
+            )
+        # (9 - 5 + 1) excess tasks / 4 workers * 20s average run
+        self.assertEqual(estimate_retry_after(9), 25)
@@ -0,0 +1,79 @@
+"""
+Request throttling and admission control.
+
+Throttle counters live in the default cache, which is shared by all web
+processes (see CACHES in settings), so limits hold across workers.
+"""
+import math
+
+from django.conf import settings
+from rest_framework.throttling import SimpleRateThrottle
+
+from .models import AutomationJob
+
+
+class LoginRateThrottle(SimpleRateThrottle):
+    """
+    Limits login attempts per client IP. Every attempt runs a full password
+    hash, so this caps the CPU a single client can burn.
+    """
+    scope = 'auth_login'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class RegisterRateThrottle(LoginRateThrottle):
+    """
+    Limits registrations per client IP.
+    """
+    scope = 'auth_register'
+
+
+class AuthBurstRateThrottle(SimpleRateThrottle):
+    """
+    Limits login and registration attempts across all clients together, so
+    bursts from many IPs can't occupy every web worker with password hashing.
+    """
+    scope = 'auth_burst'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': 'all'}
+
+
+def get_queue_depth() -> int:
+    """
+    Number of tasks waiting in the Django-Q broker (not yet picked up).
+    """
+    from django_q.brokers import get_broker
+
+    return get_broker().queue_size()
+
+
+def estimate_retry_after(queue_depth: int) -> int:
+    """
+    Seconds until the queue is expected to have drained below the admission
+    limit, from the average run time of recent jobs and the worker count.
+    """
+    recent = AutomationJob.objects.filter(
+        status='completed',
+        started_at__isnull=False,
+        finished_at__isnull=False
+    ).values_list('started_at', 'finished_at')[:20]
+    run_times = [(finished - started).total_seconds() for started, finished in recent]
+    average_run = sum(run_times) / len(run_times) if run_times else settings.Q_CLUSTER['timeout']
+
+    excess = queue_depth - settings.SCRAPE_ADMISSION_QUEUE_LIMIT + 1
+    workers = settings.Q_CLUSTER['workers']
+    return max(math.ceil(excess / workers * average_run), 1)
+
+
+def check_scrape_admission():
+    """
+    Return None if new scrape work may be queued, otherwise the number of
+    seconds the client should wait before retrying.
+    """
+    queue_depth = get_queue_depth()
+    if queue_depth < settings.SCRAPE_ADMISSION_QUEUE_LIMIT:
+        return None
+    return estimate_retry_after(queue_depth)
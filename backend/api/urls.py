@@ -14,6 +14,12 @@ urlpatterns = [
     # Automation endpoints
     path("automation/scrape-products/", views.ScrapeProductsView.as_view(), name="scrape_products"),
     path("automation/jobs/", views.AutomationJobListView.as_view(), name="automation_jobs"),
+    path("automation/jobs/metrics/", views.AutomationJobMetricsView.as_view(), name="automation_job_metrics"),
+    path("automation/jobs/<int:job_id>/events/", views.AutomationJobEventsView.as_view(), name="automation_job_events"),
+
+    # Cached product images (by content hash)
+    path("images/<str:image_hash>/", views.ProductImageView.as_view(), name="product_image"),
+    path("images/<str:image_hash>/thumb/", views.ProductImageView.as_view(thumbnail=True), name="product_image_thumbnail"),
 
     # Auth
     path("auth/register/", auth_views.register_user, name="register_user"),
@@ -1,21 +1,46 @@
+import json
+import os
+from datetime import datetime, time
+
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.views import APIView
+from django.conf import settings
+from django.db import transaction
+from django.http import FileResponse, Http404, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.views import View
+
+from automation.images import get_image_path, sniff_content_type
+from automation.sources import SOURCES, get_source
 
+from .job_events import REVISION_MISSING, aget_job_revision, get_job_change_hub
+from .job_metrics import summarize_job_metrics
+from .job_queue import enqueue_job, get_active_key
 from .models import Product, AutomationJob
+from .pagination import AutomationJobCursorPagination
+from .product_changes import ChangesPruned, get_latest_seq, get_product_changes
 from .serializers import ProductSerializer, AutomationJobSerializer
+from .throttling import check_scrape_admission
 
 
 class ProductViewSet(viewsets.ModelViewSet):
     """
     ViewSet for Product CRUD operations.
-    Supports: list, retrieve, create, update, partial_update, destroy
+    Supports: list, retrieve, create, update, partial_update, destroy,
+    plus the incremental change feed at products/changes/
     Currently using AllowAny for development (no authentication required).
     """
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
     # No permission_classes - will use DEFAULT_PERMISSION_CLASSES (AllowAny) from settings
+    # Reads authenticate from the JWT claims alone (see api.authentication)
+    jwt_stateless_reads = True
+    changes_default_limit = 500
+    changes_max_limit = 5000
 
     def get_queryset(self):
         """
@@ -24,42 +49,131 @@ class ProductViewSet(viewsets.ModelViewSet):
         queryset = Product.objects.all()
         return queryset.order_by('-last_updated')
 
+    # Product writes and their change log entries commit together
+    @transaction.atomic
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+
+    @action(detail=False, methods=['get'], url_path='changes')
+    def changes(self, request):
+        """
+        GET /api/products/changes/?since=<seq>&limit=<n>
+        Products created, updated or deleted after sequence number `since`
+        (default 0), one entry per product with its current data. Pass the
+        returned "next" as `since` on the following call; "has_more" means
+        more changes are waiting. 410 if the cursor is older than the
+        retained change log: the consumer must reload the full list and
+        continue from the "latest" sequence number returned with the 410.
+        """
+        try:
+            since = int(request.query_params.get('since', 0))
+            limit = int(request.query_params.get('limit', self.changes_default_limit))
+        except ValueError:
+            return Response({'detail': 'since and limit must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        if since < 0:
+            return Response({'detail': 'since must not be negative'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = min(max(limit, 1), self.changes_max_limit)
+
+        # Read before the feed, so it never runs ahead of what is returned
+        latest = get_latest_seq()
+        try:
+            feed = get_product_changes(since, limit)
+        except ChangesPruned as e:
+            return Response({'detail': str(e), 'latest': latest}, status=status.HTTP_410_GONE)
+
+        products = [product for _, _, _, product in feed['changes'] if product is not None]
+        serialized = iter(self.get_serializer(products, many=True).data)
+        changes = [
+            {
+                'seq': seq,
+                'action': change_action,
+                'product_id': product_id,
+                'product': next(serialized) if product is not None else None,
+            }
+            for seq, change_action, product_id, product in feed['changes']
+        ]
+        return Response({
+            'since': since,
+            'next': feed['next'],
+            'has_more': feed['has_more'],
+            'latest': latest,
+            'changes': changes,
+        }, status=status.HTTP_200_OK)
+
 
 class ScrapeProductsView(APIView):
     """
-    POST endpoint to trigger product scraping automation job.
-    Creates an AutomationJob and queues it using Django-Q.
+    POST endpoint to trigger product scraping automation jobs.
+    Queues one AutomationJob per requested source ("sources", default: all
+    registered sources) using Django-Q, so sources are scraped in parallel on
+    the worker pool. A source that already has an identical scrape queued or
+    running returns that job instead. Pass "force": true to always queue new jobs.
+    Throttled per client ("scrape" scope) and refused with 429 + Retry-After
+    while the task queue is full.
     Currently using AllowAny for development (no authentication required).
     """
     # No permission_classes - will use DEFAULT_PERMISSION_CLASSES (AllowAny) from settings
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'scrape'
 
     def post(self, request):
         """
-        Create a new scraping job and queue it for background processing.
+        Create scraping jobs and queue them for background processing.
         """
+        if not isinstance(request.data, dict):
+            return Response({'detail': 'Request body must be a JSON object'}, status=status.HTTP_400_BAD_REQUEST)
+        force = str(request.data.get('force', request.query_params.get('force', ''))).lower() in ('1', 'true', 'yes')
+
+        source_names = request.data.get('sources') or list(SOURCES)
+        if isinstance(source_names, str):
+            source_names = [name.strip() for name in source_names.split(',') if name.strip()]
+        if not isinstance(source_names, list) or not all(isinstance(name, str) for name in source_names):
+            return Response({'detail': '"sources" must be a list of source names'}, status=status.HTTP_400_BAD_REQUEST)
         try:
-            # Create AutomationJob with queued status
-            job = AutomationJob.objects.create(
-                job_type='scrape_products',
-                status='queued'
-            )
+            sources = [get_source(name) for name in source_names]
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Queue the task using Django-Q
-            from django_q.tasks import async_task
-            from api.tasks import run_scrape_products_job
-            
-            task = async_task(
-                run_scrape_products_job,
-                job.id,
-                task_name=f'scrape_products_{job.id}'
-            )
+        # Requests that only join already active jobs add no work, admit them
+        active_keys = {get_active_key('scrape_products', {'source': source.name}) for source in sources}
+        adds_work = force or AutomationJob.objects.filter(active_key__in=active_keys).count() < len(active_keys)
+        if adds_work:
+            retry_after = check_scrape_admission()
+            if retry_after is not None:
+                response = Response(
+                    {'detail': f'Scrape queue is full, retry in {retry_after} seconds'},
+                    status=status.HTTP_429_TOO_MANY_REQUESTS
+                )
+                response['Retry-After'] = str(retry_after)
+                return response
 
-            return Response(
-                {
+        try:
+            jobs = []
+            for source in sources:
+                job, created = enqueue_job('scrape_products', {'source': source.name}, force=force)
+                jobs.append({
+                    'source': source.name,
                     'job_id': job.id,
                     'status': job.status,
+                    'coalesced': not created,
+                })
+
+            any_created = any(not job['coalesced'] for job in jobs)
+            return Response(
+                {
+                    # First job at the top level, as before multi-source scrapes
+                    **{key: jobs[0][key] for key in ('job_id', 'status', 'coalesced')},
+                    'jobs': jobs,
                 },
-                status=status.HTTP_201_CREATED
+                status=status.HTTP_201_CREATED if any_created else status.HTTP_200_OK
             )
         except Exception as e:
             return Response(
@@ -73,15 +187,196 @@ class ScrapeProductsView(APIView):
 
 class AutomationJobListView(APIView):
     """
-    GET endpoint to retrieve the last 20 automation jobs.
+    GET endpoint to retrieve automation jobs, newest first, with cursor pagination.
+    Optional filters: status, job_type, created_after, created_before
+    (ISO 8601 date or datetime).
+    Currently using AllowAny for development (no authentication required).
+    """
+    # No permission_classes - will use DEFAULT_PERMISSION_CLASSES (AllowAny) from settings
+    jwt_stateless_reads = True
+    pagination_class = AutomationJobCursorPagination
+
+    def get(self, request):
+        """
+        Return a page of AutomationJob entries ordered by created_at desc.
+        """
+        try:
+            jobs = self._filter_jobs(AutomationJob.objects.all(), request.query_params)
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(jobs, request, view=self)
+        serializer = AutomationJobSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    def _filter_jobs(self, queryset, params):
+        """
+        Apply the query parameter filters; raises ValueError on invalid values.
+        """
+        job_status = params.get('status')
+        if job_status:
+            if job_status not in dict(AutomationJob.STATUS_CHOICES):
+                raise ValueError(f"Invalid status '{job_status}'")
+            queryset = queryset.filter(status=job_status)
+
+        job_type = params.get('job_type')
+        if job_type:
+            if job_type not in dict(AutomationJob.JOB_TYPE_CHOICES):
+                raise ValueError(f"Invalid job_type '{job_type}'")
+            queryset = queryset.filter(job_type=job_type)
+
+        created_after = params.get('created_after')
+        if created_after:
+            queryset = queryset.filter(created_at__gte=self._parse_timestamp('created_after', created_after))
+
+        created_before = params.get('created_before')
+        if created_before:
+            queryset = queryset.filter(created_at__lt=self._parse_timestamp('created_before', created_before))
+
+        return queryset
+
+    def _parse_timestamp(self, name, value):
+        """
+        Parse an ISO 8601 date or datetime into an aware datetime.
+        """
+        try:
+            parsed = parse_datetime(value)
+            if parsed is None:
+                parsed_date = parse_date(value)
+                if parsed_date is not None:
+                    parsed = datetime.combine(parsed_date, time.min)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValueError(f"Invalid {name} '{value}', expected an ISO 8601 date or datetime")
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+
+class AutomationJobMetricsView(APIView):
+    """
+    GET endpoint aggregating timing and throughput metrics of recent jobs.
+    Query params: limit (number of most recent finished jobs, default 50,
+    max 500) and optional job_type.
     Currently using AllowAny for development (no authentication required).
     """
     # No permission_classes - will use DEFAULT_PERMISSION_CLASSES (AllowAny) from settings
+    jwt_stateless_reads = True
+    default_limit = 50
+    max_limit = 500
 
     def get(self, request):
         """
-        Return the last 20 AutomationJob entries ordered by created_at desc.
+        Return p50/p95 per phase, queue wait and run time, failure rate and
+        throughput over the last N jobs.
         """
-        jobs = AutomationJob.objects.all()[:20]
-        serializer = AutomationJobSerializer(jobs, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        try:
+            limit = int(request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            return Response({'detail': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = min(max(limit, 1), self.max_limit)
+
+        jobs = AutomationJob.objects.filter(status__in=AutomationJob.FINISHED_STATUSES)
+        job_type = request.query_params.get('job_type')
+        if job_type:
+            jobs = jobs.filter(job_type=job_type)
+        jobs = jobs.only(
+            'status', 'started_at', 'finished_at', 'queue_wait_seconds', 'phase_durations',
+            'pages_fetched', 'pages_failed',
+            'products_created', 'products_updated', 'products_unchanged',
+        )[:limit]
+
+        return Response(summarize_job_metrics(jobs), status=status.HTTP_200_OK)
+
+
+class AutomationJobEventsView(View):
+    """
+    GET endpoint streaming a single job's status and progress as Server-Sent Events.
+    Sends the job once on connect and again on every change, then closes the
+    stream once the job is completed or failed.
+    Served asynchronously, so idle watchers do not hold a worker thread under ASGI.
+    """
+
+    async def get(self, request, job_id):
+        # Read the revision before the job so no change can slip in between
+        revision = await aget_job_revision(job_id)
+        job = await AutomationJob.objects.filter(id=job_id).afirst()
+        if job is None:
+            return JsonResponse({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        response = StreamingHttpResponse(
+            self._stream(job, revision),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    async def _stream(self, job, revision):
+        hub = get_job_change_hub()
+        while True:
+            data = json.dumps(AutomationJobSerializer(job).data)
+            yield f"event: job\ndata: {data}\n\n"
+            if job.status in AutomationJob.FINISHED_STATUSES:
+                return
+
+            new_revision = await hub.wait_for_change(
+                job.id, revision, settings.JOB_EVENTS_HEARTBEAT
+            )
+            while new_revision is None:
+                if revision is None and not await AutomationJob.objects.filter(
+                    id=job.id
+                ).exclude(status__in=AutomationJob.FINISHED_STATUSES).aexists():
+                    # Without a revision the hub can't see the job finish
+                    # (that drops the key), so check the database instead
+                    break
+                # Keep proxies from closing the idle connection
+                yield ": keep-alive\n\n"
+                new_revision = await hub.wait_for_change(
+                    job.id, revision, settings.JOB_EVENTS_HEARTBEAT
+                )
+            if new_revision is REVISION_MISSING:
+                # The job finished, or its revision expired or was evicted: start
+                # over from the database
+                revision = await aget_job_revision(job.id)
+            else:
+                revision = new_revision
+
+            job = await AutomationJob.objects.filter(id=job.id).afirst()
+            if job is None:
+                return
+
+
+class ProductImageView(View):
+    """
+    GET endpoint serving a product image (or its thumbnail) from the local
+    image cache by content hash. The content behind a URL never changes, so
+    responses are cacheable for settings.IMAGE_CACHE_MAX_AGE and marked
+    immutable. Thumbnails fall back to the original when none was made.
+    """
+    thumbnail = False
+
+    def get(self, request, image_hash):
+        try:
+            path = get_image_path(image_hash, thumbnail=self.thumbnail)
+            if self.thumbnail and not os.path.exists(path):
+                path = get_image_path(image_hash)
+        except ValueError:
+            raise Http404("Unknown image")
+
+        etag = f'"{os.path.basename(path)}"'
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponseNotModified()
+        else:
+            try:
+                image = open(path, 'rb')
+            except FileNotFoundError:
+                raise Http404("Unknown image")
+            content_type = sniff_content_type(image.read(16)) or 'application/octet-stream'
+            image.seek(0)
+            response = FileResponse(image, content_type=content_type)
+        response['ETag'] = etag
+        response['Cache-Control'] = f'public, max-age={settings.IMAGE_CACHE_MAX_AGE}, immutable'
+        return response
@@ -0,0 +1,232 @@
+"""
+Content-addressed local cache for product images.
+
+Images are stored once per distinct content under settings.IMAGE_CACHE_DIR
+as <aa>/<sha256> (aa being the first two hex digits), next to a
+<sha256>.thumb.jpg thumbnail. Thumbnails need Pillow; without it only the
+originals are cached and served.
+
+Image URLs come from scraped pages, so downloads are limited to http(s) and
+to public addresses: every connection (redirects included) checks the
+addresses its host resolves to and connects to the checked address.
+"""
+import hashlib
+import http.client
+import ipaddress
+import os
+import re
+import socket
+import tempfile
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+HASH_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+USER_AGENT = 'Mozilla/5.0 (compatible; ecommerce-automation image cache)'
+
+# First bytes of the image formats served back with their content type
+IMAGE_SIGNATURES = [
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+]
+
+
+def sniff_content_type(data: bytes) -> Optional[str]:
+    """
+    Content type of an image from its first bytes, None if not recognised.
+    """
+    for signature, content_type in IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return content_type
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    return None
+
+
+def get_image_path(image_hash: str, thumbnail: bool = False) -> str:
+    """
+    Path of a cached image (or its thumbnail) in the store.
+    """
+    if not HASH_PATTERN.match(image_hash):
+        raise ValueError(f"Invalid image hash: {image_hash!r}")
+    name = f"{image_hash}.thumb.jpg" if thumbnail else image_hash
+    return os.path.join(settings.IMAGE_CACHE_DIR, image_hash[:2], name)
+
+
+def _write_atomic(path: str, data: bytes):
+    """
+    Write a file so readers never see it half-written.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def make_thumbnail(data: bytes) -> Optional[bytes]:
+    """
+    A JPEG no larger than settings.IMAGE_THUMBNAIL_SIZE on either side, or
+    None when Pillow isn't installed.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+
+    with Image.open(BytesIO(data)) as image:
+        size = settings.IMAGE_THUMBNAIL_SIZE
+        image.thumbnail((size, size))
+        output = BytesIO()
+        image.convert('RGB').save(output, 'JPEG', quality=80, optimize=True)
+    return output.getvalue()
+
+
+def store_image(data: bytes) -> str:
+    """
+    Add an image to the store (a no-op for content already stored).
+
+    Returns:
+        The image's sha256 hex digest
+    """
+    image_hash = hashlib.sha256(data).hexdigest()
+    path = get_image_path(image_hash)
+    if not os.path.exists(path):
+        _write_atomic(path, data)
+
+    thumbnail_path = get_image_path(image_hash, thumbnail=True)
+    if not os.path.exists(thumbnail_path):
+        try:
+            thumbnail = make_thumbnail(data)
+        except Exception as e:
+            # The original is still served in its place
+            print(f"Error creating thumbnail for image {image_hash}: {e}")
+            thumbnail = None
+        if thumbnail is not None:
+            _write_atomic(thumbnail_path, thumbnail)
+    return image_hash
+
+
+class DisallowedImageURL(ValueError):
+    """
+    The URL's scheme isn't http(s) or its host isn't a public address.
+    """
+
+
+def _is_public_address(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split('%')[0])
+    if ip.version == 6 and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def _create_public_connection(address, timeout=socket._GLOBAL_DEFAULT_TIMEOUT, source_address=None):
+    """
+    socket.create_connection() refusing hosts that resolve to private,
+    loopback, link-local or otherwise non-public addresses.
+
+    The socket connects to the address that was checked, so the host can't
+    resolve to a different one in between.
+    """
+    host, port = address
+    addresses = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    for *_, sockaddr in addresses:
+        if not _is_public_address(sockaddr[0]):
+            raise DisallowedImageURL(f"{host} resolves to non-public address {sockaddr[0]}")
+    return socket.create_connection(addresses[0][4][:2], timeout, source_address)
+
+
+class _PublicHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _create_public_connection
+
+
+class _PublicHTTPSConnection(http.client.HTTPSConnection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _create_public_connection
+
+
+class _PublicHTTPHandler(urllib.request.HTTPHandler):
+    def http_open(self, req):
+        return self.do_open(_PublicHTTPConnection, req)
+
+
+class _PublicHTTPSHandler(urllib.request.HTTPSHandler):
+    def https_open(self, req):
+        return self.do_open(_PublicHTTPSConnection, req, context=self._context)
+
+
+def _build_opener() -> urllib.request.OpenerDirector:
+    # No proxy, ftp, file or data handlers: redirects can only lead to
+    # another public http(s) URL
+    opener = urllib.request.OpenerDirector()
+    for handler in (
+        _PublicHTTPHandler(), _PublicHTTPSHandler(), urllib.request.HTTPRedirectHandler(),
+        urllib.request.HTTPDefaultErrorHandler(), urllib.request.HTTPErrorProcessor(),
+        urllib.request.UnknownHandler(),
+    ):
+        opener.add_handler(handler)
+    return opener
+
+
+def check_image_url(url: str):
+    """
+    Raise DisallowedImageURL unless the URL is http(s) with a host name.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        raise DisallowedImageURL(f"Only http(s) image URLs are fetched: {url!r}")
+
+
+def fetch_image(url: str) -> Optional[str]:
+    """
+    Download an image into the store (http(s) on public addresses only).
+
+    Returns:
+        The image's sha256 hex digest, or None if it couldn't be fetched, is
+        disallowed or isn't an image
+    """
+    try:
+        check_image_url(url)
+        request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+        with _build_opener().open(request, timeout=settings.IMAGE_DOWNLOAD_TIMEOUT) as response:
+            data = response.read(settings.IMAGE_MAX_BYTES + 1)
+        if len(data) > settings.IMAGE_MAX_BYTES:
+            raise ValueError(f"larger than {settings.IMAGE_MAX_BYTES} bytes")
+        if sniff_content_type(data) is None:
+            raise ValueError("not a supported image")
+        return store_image(data)
+    except Exception as e:
+        print(f"Error caching image {url}: {e}")
+        return None
+
+
+def cache_images(urls: Iterable[str]) -> Dict[str, str]:
+    """
+    Download images concurrently (settings.IMAGE_DOWNLOAD_CONCURRENCY at a
+    time), each distinct URL once.
+
+    Returns:
+        Dict mapping each successfully cached URL to its image hash
+    """
+    unique_urls = list(dict.fromkeys(url for url in urls if url))
+    if not unique_urls:
+        return {}
+
+    workers = min(settings.IMAGE_DOWNLOAD_CONCURRENCY, len(unique_urls))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        hashes = executor.map(fetch_image, unique_urls)
+        return {url: image_hash for url, image_hash in zip(unique_urls, hashes) if image_hash}
@@ -0,0 +1,38 @@
+"""
+Timing and throughput metrics collected while an automation job runs.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+
+class JobMetrics:
+    """
+    Accumulates per-phase durations (in seconds) and counters for one job.
+    Safe to share between the threads scraping pages of the same job.
+    """
+
+    def __init__(self):
+        self.phase_durations: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add_duration(self, phase: str, seconds: float):
+        with self._lock:
+            self.phase_durations[phase] = self.phase_durations.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, phase: str):
+        """
+        Time the enclosed block and add it to the given phase.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_duration(phase, time.perf_counter() - start)
+
+    def increment(self, counter: str, amount: int = 1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
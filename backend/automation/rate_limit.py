@@ -0,0 +1,104 @@
+"""
+Request spacing and concurrency limits for polite scraping.
+
+A source can be scraped by several jobs at once (forced scrapes, a scheduled
+sync overlapping a manual one), each on its own Django-Q worker process, so
+the limits are kept in the default cache, which is shared by all processes.
+They hold across processes as far as the backend's add() is atomic (Redis,
+Memcached, database); the file-based cache narrows but doesn't close the race.
+"""
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.core.cache import cache
+
+# Seconds after which the cache lock guarding the next request slot is
+# considered abandoned (its holder only reads and writes one key)
+LOCK_TIMEOUT = 5
+
+# Seconds a concurrency slot stays taken if its holder dies without releasing
+# it; longer than a page load (30s) plus the wait for its content (10s)
+SLOT_LEASE = 120
+
+# Seconds between attempts to take a busy lock or slot
+POLL_INTERVAL = 0.05
+
+
+@contextmanager
+def _cache_lock(key: str):
+    token = uuid.uuid4().hex
+    while not cache.add(key, token, LOCK_TIMEOUT):
+        time.sleep(POLL_INTERVAL)
+    try:
+        yield
+    finally:
+        if cache.get(key) == token:
+            cache.delete(key)
+
+
+class RateLimiter:
+    """
+    Limiter allowing at most one request every `min_interval` seconds to
+    whatever `key` names, across all threads and processes using that key.
+    """
+
+    def __init__(self, key: str, min_interval: float):
+        self.key = key
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+
+    def wait(self) -> float:
+        """
+        Block until the next request slot.
+
+        Returns:
+            Seconds spent waiting
+        """
+        with self._lock, _cache_lock(f"{self.key}:lock"):
+            now = time.time()
+            slot = max(now, cache.get(f"{self.key}:next_slot", 0.0))
+            # Kept just long enough to space the request after this one
+            cache.set(f"{self.key}:next_slot", slot + self.min_interval, slot - now + self.min_interval + 1)
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class ConcurrencyLimiter:
+    """
+    Counting semaphore allowing at most `limit` holders of `key` at once,
+    across all threads and processes. Each slot is a cache entry leased for
+    `lease` seconds, so slots of crashed holders free up on their own.
+    """
+
+    def __init__(self, key: str, limit: int, lease: float = SLOT_LEASE):
+        self.key = key
+        self.limit = limit
+        self.lease = lease
+
+    @contextmanager
+    def slot(self):
+        """
+        Hold one slot for the duration of the block, waiting for one to free up.
+
+        Yields:
+            Seconds spent waiting
+        """
+        token = uuid.uuid4().hex
+        start = time.monotonic()
+        slot_key = None
+        while slot_key is None:
+            for index in range(self.limit):
+                if cache.add(f"{self.key}:slot:{index}", token, self.lease):
+                    slot_key = f"{self.key}:slot:{index}"
+                    break
+            else:
+                time.sleep(POLL_INTERVAL)
+        try:
+            yield time.monotonic() - start
+        finally:
+            if cache.get(slot_key) == token:
+                cache.delete(slot_key)
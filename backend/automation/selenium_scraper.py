@@ -1,8 +1,13 @@
 """
-Selenium-based web scraper for BooksToScrape website.
+Selenium-based web scraper for the sources in automation.sources.
+
+Importing this module loads Selenium and webdriver-manager, so callers that
+only run on demand (tasks, benchmarks) import it lazily.
 """
+import threading
 import time
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Dict, Optional
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -11,21 +16,21 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.common.exceptions import TimeoutException, WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
+from django.conf import settings
+
+from .metrics import JobMetrics
+from .rate_limit import ConcurrencyLimiter, RateLimiter
+from .sources import DEFAULT_SOURCE, ScrapeSource, get_source
+from .sync import sync_products_to_db  # noqa: F401 - kept importable from here
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
 
 
-def fetch_products_from_source() -> List[Dict]:
+def _build_chrome_options() -> Options:
     """
-    Scrape products from https://books.toscrape.com for the first 2 pages.
-    
-    Returns:
-        List of dictionaries with keys: name, price, rating, stock, image_url, source_url
-    
-    Raises:
-        Exception: If scraping fails
+    Chrome options for headless, low-noise scraping.
     """
-    products = []
-    
-    # Configure Chrome options for optimal scraping
     chrome_options = Options()
     
     # Headless mode (set to False to see browser for debugging)
@@ -52,115 +57,229 @@ def fetch_products_from_source() -> List[Dict]:
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option('useAutomationExtension', False)
     
-    driver = None
+    return chrome_options
+
+
+def get_driver_path() -> str:
+    """
+    Path of the ChromeDriver binary: settings.CHROMEDRIVER_PATH when set,
+    otherwise resolved (and downloaded if needed) by webdriver-manager.
+    
+    webdriver-manager checks the latest driver version over the network, so
+    the result is cached for the lifetime of the process.
+    """
+    global _driver_path
+    if _driver_path is None:
+        with _driver_path_lock:
+            if _driver_path is None:
+                _driver_path = settings.CHROMEDRIVER_PATH or ChromeDriverManager().install()
+    return _driver_path
+
+
+def warm_up():
+    """
+    Resolve the ChromeDriver path ahead of the first job.
     
-    try:
-        # Initialize Chrome driver using webdriver-manager
-        # This automatically downloads and manages the ChromeDriver
-        print("Initializing Chrome driver...")
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        
-        # Set timeouts
-        driver.implicitly_wait(10)
-        driver.set_page_load_timeout(30)
-        
-        # Verify Chrome connection by checking driver capabilities
-        print(f"Chrome driver initialized successfully. Browser: {driver.capabilities.get('browserName', 'Unknown')}, Version: {driver.capabilities.get('browserVersion', 'Unknown')}")
-        
+    Called by the qcluster process at startup; the workers it forks (and the
+    ones replacing recycled workers) inherit the loaded modules and the
+    resolved path.
+    """
+    print(f"Scraper warmed up, ChromeDriver at {get_driver_path()}")
+
+
+def _start_driver():
+    """
+    Start a headless Chrome driver managed by webdriver-manager.
+    """
+    print("Initializing Chrome driver...")
+    service = Service(get_driver_path())
+    driver = webdriver.Chrome(service=service, options=_build_chrome_options())
+    
+    # Set timeouts
+    driver.implicitly_wait(10)
+    driver.set_page_load_timeout(30)
+    
+    # Verify Chrome connection by checking driver capabilities
+    print(f"Chrome driver initialized successfully. Browser: {driver.capabilities.get('browserName', 'Unknown')}, Version: {driver.capabilities.get('browserVersion', 'Unknown')}")
+    return driver
+
+
+def parse_books_toscrape_page(driver) -> List[Dict]:
+    """
+    Extract the products of a loaded https://books.toscrape.com listing page.
+    """
+    products = []
+    
+    # Find all product containers
+    product_containers = driver.find_elements(By.CLASS_NAME, "product_pod")
+
+    for container in product_containers:
+        try:
+            # Extract product name/title
+            name_elem = container.find_element(By.TAG_NAME, "h3")
+            name = name_elem.find_element(By.TAG_NAME, "a").get_attribute("title")
+
+            # Extract price
+            price_elem = container.find_element(By.CLASS_NAME, "price_color")
+            price_text = price_elem.text.replace("£", "").strip()
+
+            # Extract rating (convert star rating to integer 0-5)
+            rating_elem = container.find_element(By.CLASS_NAME, "star-rating")
+            rating_class = rating_elem.get_attribute("class")
+            rating_text = rating_class.split()[-1] if len(rating_class.split()) > 1 else "Zero"
+            # Convert text rating to integer (Zero=0, One=1, Two=2, Three=3, Four=4, Five=5)
+            rating_map = {"Zero": 0, "One": 1, "Two": 2, "Three": 3, "Four": 4, "Five": 5}
+            rating = rating_map.get(rating_text, 0)
+
+            # Extract stock availability (as integer: 1 for in stock, 0 for out of stock)
+            availability_elem = container.find_element(By.CLASS_NAME, "availability")
+            stock_text = availability_elem.text.strip()
+            stock = 1 if "In stock" in stock_text else 0
+
+            # Extract image URL
+            image_elem = container.find_element(By.TAG_NAME, "img")
+            image_url = image_elem.get_attribute("src")
+            # Convert relative URL to absolute
+            if image_url.startswith("../"):
+                image_url = "https://books.toscrape.com/" + image_url.replace("../", "")
+            elif not image_url.startswith("http"):
+                image_url = "https://books.toscrape.com/" + image_url
+
+            # Extract source URL
+            link_elem = name_elem.find_element(By.TAG_NAME, "a")
+            source_url = link_elem.get_attribute("href")
+            # Convert relative URL to absolute
+            if source_url.startswith("../"):
+                source_url = "https://books.toscrape.com/catalogue/" + source_url.replace("../catalogue/", "")
+            elif not source_url.startswith("http"):
+                source_url = "https://books.toscrape.com/catalogue/" + source_url
+
+            product_data = {
+                "name": name,
+                "price": price_text,
+                "rating": rating,
+                "stock": stock,
+                "image_url": image_url,
+                "source_url": source_url
+            }
+
+            products.append(product_data)
+
+        except Exception as e:
+            # Skip individual product if extraction fails
+            print(f"Error extracting product: {e}")
+            continue
+
+    
+    return products
+
+
+def fetch_products_from_source(
+    source: Optional[ScrapeSource] = None,
+    page_callback: Optional[Callable[[int, int, List[Dict]], None]] = None,
+    metrics: Optional[JobMetrics] = None,
+    start_page: int = 1
+) -> List[Dict]:
+    """
+    Scrape the listing pages of a source, up to source.max_concurrency pages
+    at once (one browser each) and no faster than source.request_delay. Both
+    limits are shared with every other job scraping the same source.
+    
+    Args:
+        source: Source to scrape (defaults to books.toscrape.com)
+        page_callback: Optional callable invoked as (page_num, total_pages,
+            page_products) after each page has been processed, including
+            pages that failed to load (with an empty product list). Pages may
+            complete out of order; the callback always runs in the calling
+            thread, so it may use the database
+        metrics: Optional JobMetrics receiving browser_startup, page_load,
+            extraction and politeness_delay durations plus pages_fetched and
+            pages_failed counters
+        start_page: First page to scrape, used to resume an interrupted crawl
+    
+    Returns:
+        List of dictionaries with keys: name, price, rating, stock, image_url, source_url
+    
+    Raises:
+        Exception: If the browser can't be started
+    """
+    source = source or get_source(DEFAULT_SOURCE)
+    parser = source.get_parser()
+    if metrics is None:
+        metrics = JobMetrics()
+    
+    total_pages = len(source.listing_urls)
+    pages = list(enumerate(source.listing_urls, start=1))[start_page - 1:]
+    if not pages:
+        return []
+    
+    products = []
+    limits_key = f"scrape_source:{source.name}"
+    limiter = RateLimiter(limits_key, source.request_delay)
+    slots = ConcurrencyLimiter(limits_key, source.max_concurrency)
+    drivers = []
+    drivers_lock = threading.Lock()
+    local = threading.local()
+    
+    def get_driver():
+        # One browser per worker thread, reused for all its pages
+        if getattr(local, 'driver', None) is None:
+            try:
+                with metrics.phase('browser_startup'):
+                    local.driver = _start_driver()
+            except WebDriverException as e:
+                raise Exception(f"WebDriver error: {str(e)}")
+            with drivers_lock:
+                drivers.append(local.driver)
+        return local.driver
+    
+    def scrape_page(page_num: int, url: str) -> List[Dict]:
+        driver = get_driver()
         
-        # Scrape first 2 pages
-        for page_num in range(1, 3):
-            url = f"https://books.toscrape.com/catalogue/page-{page_num}.html" if page_num > 1 else "https://books.toscrape.com/"
+        # Space requests to be respectful to the source, and load no more
+        # of its pages at once than it allows across all jobs
+        with slots.slot() as slot_wait:
+            metrics.add_duration('politeness_delay', slot_wait + limiter.wait())
             
             try:
+                page_start = time.perf_counter()
                 driver.get(url)
                 WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CLASS_NAME, "product_pod"))
+                    EC.presence_of_element_located((By.CLASS_NAME, source.wait_for_class))
                 )
+                extraction_start = time.perf_counter()
+                metrics.add_duration('page_load', extraction_start - page_start)
                 
-                # Find all product containers
-                product_containers = driver.find_elements(By.CLASS_NAME, "product_pod")
-                
-                for container in product_containers:
-                    try:
-                        # Extract product name/title
-                        name_elem = container.find_element(By.TAG_NAME, "h3")
-                        name = name_elem.find_element(By.TAG_NAME, "a").get_attribute("title")
-                        
-                        # Extract price
-                        price_elem = container.find_element(By.CLASS_NAME, "price_color")
-                        price_text = price_elem.text.replace("£", "").strip()
-                        
-                        # Extract rating (convert star rating to integer 0-5)
-                        rating_elem = container.find_element(By.CLASS_NAME, "star-rating")
-                        rating_class = rating_elem.get_attribute("class")
-                        rating_text = rating_class.split()[-1] if len(rating_class.split()) > 1 else "Zero"
-                        # Convert text rating to integer (Zero=0, One=1, Two=2, Three=3, Four=4, Five=5)
-                        rating_map = {"Zero": 0, "One": 1, "Two": 2, "Three": 3, "Four": 4, "Five": 5}
-                        rating = rating_map.get(rating_text, 0)
-                        
-                        # Extract stock availability (as integer: 1 for in stock, 0 for out of stock)
-                        availability_elem = container.find_element(By.CLASS_NAME, "availability")
-                        stock_text = availability_elem.text.strip()
-                        stock = 1 if "In stock" in stock_text else 0
-                        
-                        # Extract image URL
-                        image_elem = container.find_element(By.TAG_NAME, "img")
-                        image_url = image_elem.get_attribute("src")
-                        # Convert relative URL to absolute
-                        if image_url.startswith("../"):
-                            image_url = "https://books.toscrape.com/" + image_url.replace("../", "")
-                        elif not image_url.startswith("http"):
-                            image_url = "https://books.toscrape.com/" + image_url
-                        
-                        # Extract source URL
-                        link_elem = name_elem.find_element(By.TAG_NAME, "a")
-                        source_url = link_elem.get_attribute("href")
-                        # Convert relative URL to absolute
-                        if source_url.startswith("../"):
-                            source_url = "https://books.toscrape.com/catalogue/" + source_url.replace("../catalogue/", "")
-                        elif not source_url.startswith("http"):
-                            source_url = "https://books.toscrape.com/catalogue/" + source_url
-                        
-                        product_data = {
-                            "name": name,
-                            "price": price_text,
-                            "rating": rating,
-                            "stock": stock,
-                            "image_url": image_url,
-                            "source_url": source_url
-                        }
-                        
-                        products.append(product_data)
-                        
-                    except Exception as e:
-                        # Skip individual product if extraction fails
-                        print(f"Error extracting product: {e}")
-                        continue
+                page_products = parser(driver)
                 
-                # Small delay between pages to be respectful
-                time.sleep(1)
+                metrics.add_duration('extraction', time.perf_counter() - extraction_start)
+                metrics.increment('pages_fetched')
+                return page_products
                 
             except TimeoutException:
-                print(f"Timeout loading page {page_num} - skipping...")
-                continue
+                print(f"Timeout loading {source.name} page {page_num} - skipping...")
             except Exception as e:
-                print(f"Error scraping page {page_num}: {e}")
-                continue
+                print(f"Error scraping {source.name} page {page_num}: {e}")
+        metrics.increment('pages_failed')
+        return []
+    
+    executor = ThreadPoolExecutor(max_workers=min(source.max_concurrency, len(pages)))
+    try:
+        futures = {
+            executor.submit(scrape_page, page_num, url): page_num
+            for page_num, url in pages
+        }
+        for future in as_completed(futures):
+            page_products = future.result()
+            products.extend(page_products)
+            if page_callback:
+                page_callback(futures[future], total_pages, page_products)
         
-        print(f"Successfully scraped {len(products)} products from 2 pages")
+        print(f"Successfully scraped {len(products)} products from {source.name} pages {start_page}-{total_pages}")
         
-    except WebDriverException as e:
-        error_msg = f"WebDriver error: {str(e)}"
-        print(error_msg)
-        raise Exception(error_msg)
-    except Exception as e:
-        error_msg = f"Scraping error: {str(e)}"
-        print(error_msg)
-        raise Exception(error_msg)
     finally:
-        if driver:
+        executor.shutdown(wait=True, cancel_futures=True)
+        for driver in drivers:
             try:
                 driver.quit()
                 print("Chrome driver closed successfully")
@@ -168,74 +287,3 @@ def fetch_products_from_source() -> List[Dict]:
                 print(f"Error closing Chrome driver: {e}")
     
     return products
-
-
-def sync_products_to_db(scraped_products: List[Dict]):
-    """
-    Upsert Product objects based on name.
-    Updates price, rating, stock, image_url, source_url, and last_synced_at.
-    Uses bulk operations where reasonable for better performance.
-    
-    Args:
-        scraped_products: List of product dictionaries from scraper
-    """
-    from api.models import Product
-    from decimal import Decimal
-    from django.utils import timezone
-    
-    products_to_create = []
-    products_to_update = []
-    now = timezone.now()
-    
-    # Get existing products by name for efficient lookup
-    existing_names = set(Product.objects.values_list('name', flat=True))
-    
-    for product_data in scraped_products:
-        try:
-            name = product_data["name"]
-            price = Decimal(product_data["price"])
-            stock = product_data["stock"]  # Already an integer (0 or 1)
-            rating = product_data["rating"]  # Already an integer (0-5)
-            image_url = product_data["image_url"]
-            source_url = product_data["source_url"]
-            
-            if name in existing_names:
-                # Update existing product
-                product = Product.objects.get(name=name)
-                product.price = price
-                product.stock = stock
-                product.rating = rating
-                product.image_url = image_url
-                product.source_url = source_url
-                product.url = source_url
-                product.last_synced_at = now
-                products_to_update.append(product)
-            else:
-                # Create new product
-                products_to_create.append(Product(
-                    name=name,
-                    price=price,
-                    stock=stock,
-                    rating=rating,
-                    image_url=image_url,
-                    source_url=source_url,
-                    url=source_url,
-                    last_synced_at=now
-                ))
-                existing_names.add(name)  # Track newly created names
-                
-        except Exception as e:
-            print(f"Error processing product {product_data.get('name', 'unknown')}: {e}")
-            continue
-    
-    # Bulk create new products
-    if products_to_create:
-        Product.objects.bulk_create(products_to_create, ignore_conflicts=True)
-    
-    # Bulk update existing products
-    if products_to_update:
-        Product.objects.bulk_update(
-            products_to_update,
-            ['price', 'stock', 'rating', 'image_url', 'source_url', 'url', 'last_synced_at']
-        )
-
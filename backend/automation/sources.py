@@ -0,0 +1,78 @@
+"""
+Registry of the sources products can be scraped from.
+
+Each source declares its listing pages, the parser extracting products from
+a loaded page and its own politeness limits. Scrape jobs run one source each,
+so a slow source only ever occupies its own Django-Q worker.
+"""
+from typing import Dict, List
+
+from django.utils.module_loading import import_string
+
+
+class ScrapeSource:
+    """
+    A scrapeable product catalogue.
+    
+    Args:
+        name: Unique source name, stored on scraped products and job parameters
+        listing_urls: Listing pages to scrape, in order (checkpoints refer to
+            their 1-based position)
+        parser: Dotted path to a callable taking a Selenium driver on a loaded
+            listing page and returning product dictionaries with keys name,
+            price, rating, stock, image_url, source_url
+        wait_for_class: CSS class that is present once a listing page has loaded
+        request_delay: Minimum seconds between two page requests to the source
+        max_concurrency: Maximum number of pages of the source loading at once
+        
+    Both limits hold for the source as a whole, across all jobs and workers
+    scraping it (see automation.rate_limit).
+    """
+
+    def __init__(self, name: str, listing_urls: List[str], parser: str, wait_for_class: str,
+                 request_delay: float = 1.0, max_concurrency: int = 1):
+        self.name = name
+        self.listing_urls = listing_urls
+        self.parser = parser
+        self.wait_for_class = wait_for_class
+        self.request_delay = request_delay
+        self.max_concurrency = max_concurrency
+
+    def get_parser(self):
+        # Resolved lazily so the registry doesn't import Selenium
+        return import_string(self.parser)
+
+    def __repr__(self):
+        return f"<ScrapeSource {self.name}>"
+
+
+SOURCES: Dict[str, ScrapeSource] = {}
+
+DEFAULT_SOURCE = 'books_toscrape'
+
+
+def register_source(source: ScrapeSource) -> ScrapeSource:
+    SOURCES[source.name] = source
+    return source
+
+
+def get_source(name: str) -> ScrapeSource:
+    """
+    Return a registered source, raising ValueError for unknown names.
+    """
+    try:
+        return SOURCES[name]
+    except KeyError:
+        raise ValueError(f"Unknown source '{name}'")
+
+
+register_source(ScrapeSource(
+    name='books_toscrape',
+    listing_urls=["https://books.toscrape.com/"] + [
+        f"https://books.toscrape.com/catalogue/page-{page_num}.html" for page_num in range(2, 3)
+    ],
+    parser='automation.selenium_scraper.parse_books_toscrape_page',
+    wait_for_class='product_pod',
+    request_delay=1.0,
+    max_concurrency=2,
+))
@@ -0,0 +1,172 @@
+"""
+Persist scraped products.
+
+Kept apart from the Selenium scraper so the web and worker processes can sync
+products without importing Selenium.
+"""
+from decimal import Decimal
+from typing import Dict, List, Sequence
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from api.models import Product
+from api.product_changes import record_product_changes
+from .images import cache_images
+from .sources import DEFAULT_SOURCE
+
+
+def sync_products_to_db(scraped_products: List[Dict], source: str = DEFAULT_SOURCE) -> Dict[str, int]:
+    """
+    Upsert the Product objects of one source based on name.
+    Updates price, rating, stock, image_url, source_url, and last_synced_at.
+    Uses bulk operations where reasonable for better performance.
+    Created and updated products are appended to the product change log.
+    Images of new products and changed image_urls are downloaded into the
+    local image cache by separate Django-Q tasks, queued once the products
+    are committed.
+    
+    Args:
+        scraped_products: List of product dictionaries from scraper
+        source: Name of the source the products were scraped from; products
+            of other sources are never touched
+    
+    Returns:
+        Dict with the number of products created, updated and unchanged, and
+        of images queued for download
+    """
+    products_to_create = []
+    # Products whose image_url is new or changed
+    image_fetches = []
+    products_to_update = []
+    unchanged_ids = []
+    seen_names = set()
+    now = timezone.now()
+    
+    # Load existing products matching the scraped names in a single query
+    scraped_names = {product_data.get("name") for product_data in scraped_products}
+    existing_products = {
+        product.name: product
+        for product in Product.objects.filter(source=source, name__in=scraped_names)
+    }
+    
+    for product_data in scraped_products:
+        try:
+            name = product_data["name"]
+            if name in seen_names:
+                # Same product listed twice in one scrape
+                continue
+            seen_names.add(name)
+            
+            fields = {
+                "price": Decimal(product_data["price"]),
+                "stock": product_data["stock"],  # Already an integer (0 or 1)
+                "rating": product_data["rating"],  # Already an integer (0-5)
+                "image_url": product_data["image_url"],
+                "source_url": product_data["source_url"],
+                "url": product_data["source_url"],
+            }
+            
+            product = existing_products.get(name)
+            if product is None:
+                # Create new product
+                product = Product(name=name, source=source, last_synced_at=now, **fields)
+                products_to_create.append(product)
+            elif all(getattr(product, field) == value for field, value in fields.items()):
+                # Nothing changed, only the sync timestamp moves
+                unchanged_ids.append(product.id)
+            else:
+                # Update existing product
+                if product.image_url != fields["image_url"]:
+                    product.image_hash = ''
+                    image_fetches.append(product)
+                for field, value in fields.items():
+                    setattr(product, field, value)
+                product.last_synced_at = now
+                product.last_updated = now
+                products_to_update.append(product)
+                
+        except Exception as e:
+            print(f"Error processing product {product_data.get('name', 'unknown')}: {e}")
+            continue
+    
+    # Products and their change log entries are committed together
+    with transaction.atomic():
+        created_ids = []
+        # Bulk create new products
+        if products_to_create:
+            Product.objects.bulk_create(products_to_create, ignore_conflicts=True)
+            # ignore_conflicts leaves the new primary keys unset, look them up
+            created_ids = list(Product.objects.filter(
+                source=source, name__in=[product.name for product in products_to_create]
+            ).order_by('id').values_list('id', flat=True))
+        
+        # Bulk update existing products
+        if products_to_update:
+            Product.objects.bulk_update(
+                products_to_update,
+                ['price', 'stock', 'rating', 'image_url', 'image_hash', 'source_url', 'url', 'last_synced_at', 'last_updated']
+            )
+        
+        # Unchanged products only need their sync timestamp
+        if unchanged_ids:
+            Product.objects.filter(id__in=unchanged_ids).update(last_synced_at=now)
+        
+        # Logged last: the change sequence stays locked until commit
+        record_product_changes('created', created_ids)
+        record_product_changes('updated', [product.id for product in products_to_update])
+        
+        # Only new or changed images are fetched, after commit and outside
+        # the scrape task's time budget
+        image_ids = []
+        if settings.IMAGE_CACHE_ENABLED:
+            image_ids = [*created_ids, *(product.id for product in image_fetches)]
+        if image_ids:
+            transaction.on_commit(lambda: queue_image_downloads(image_ids))
+    
+    return {
+        'created': len(products_to_create),
+        'updated': len(products_to_update),
+        'unchanged': len(unchanged_ids),
+        'images_queued': len(image_ids),
+    }
+
+
+def queue_image_downloads(product_ids: Sequence[int]):
+    """
+    Queue api.tasks.cache_product_images for the products, in batches of
+    settings.IMAGE_TASK_BATCH_SIZE so each task finishes within the Django-Q
+    timeout.
+    """
+    from django_q.tasks import async_task
+    
+    batch_size = settings.IMAGE_TASK_BATCH_SIZE
+    for start in range(0, len(product_ids), batch_size):
+        async_task('api.tasks.cache_product_images', list(product_ids[start:start + batch_size]))
+
+
+def cache_product_images(products: Sequence[Product]) -> Dict[str, int]:
+    """
+    Download the images of the products (settings.IMAGE_DOWNLOAD_CONCURRENCY
+    at a time) and store their hashes. Products whose image_url changed in
+    the meantime are left alone; products that got a hash are logged as
+    updated.
+    
+    Args:
+        products: Products with at least id and image_url loaded
+    
+    Returns:
+        Dict with the number of products whose image was cached and failed
+    """
+    image_hashes = cache_images(product.image_url for product in products)
+    cached_ids = []
+    with transaction.atomic():
+        for product in products:
+            image_hash = image_hashes.get(product.image_url)
+            if image_hash and Product.objects.filter(
+                id=product.id, image_url=product.image_url
+            ).update(image_hash=image_hash):
+                cached_ids.append(product.id)
+        record_product_changes('updated', cached_ids)
+    return {'cached': len(cached_ids), 'failed': len(products) - len(cached_ids)}
@@ -12,5 +12,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+# Async views run their queries on changing executor threads, so a persistent
+# connection would be left open per thread instead of being reused. Under ASGI
+# connections are closed after each request unless DB_CONN_MAX_AGE says otherwise.
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
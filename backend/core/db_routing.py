@@ -0,0 +1,186 @@
+"""
+Primary/replica database routing.
+
+Product and product change feed reads made while handling safe (GET/HEAD/
+OPTIONS) requests go to the `replica` alias; everything else - writes, other
+models, the Django-Q ORM broker and all reads in background workers - stays
+on `default` (primary).
+
+Read-your-writes: once a request writes, its remaining reads use the
+primary, and the client is pinned to the primary for
+settings.DB_REPLICA_STICKY_SECONDS, so it doesn't read stale data from a
+lagging replica right after a change. The pin is kept in the shared cache,
+keyed on the client (its Authorization header, else its IP), since
+cross-origin clients don't send cookies back; same-origin clients also get
+a cookie. "Writes" are the INSERT/UPDATE/DELETE statements actually run on
+the primary: routing a query for writing (select_for_update(),
+get_or_create() finding a row) doesn't pin.
+
+The replica is never migrated; it gets its schema from replication.
+"""
+import contextvars
+import hashlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+PRIMARY = 'default'
+REPLICA = 'replica'
+STICKY_COOKIE = 'db_primary_pin'
+
+# Models whose reads may be served by the replica. The change feed reads
+# products and their change log together, so both must come from one database.
+REPLICA_READ_MODELS = {'api.product', 'api.productchange', 'api.productchangesequence'}
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+class RequestRouting:
+    """
+    Routing state of one request. Mutated in place, so writes made on
+    executor threads (async views) are seen by the middleware.
+    """
+
+    def __init__(self, replica_reads: bool):
+        self.replica_reads = replica_reads
+        self.wrote = False
+
+
+# Routing state of the current request, None outside requests (primary only)
+_request_routing = contextvars.ContextVar('request_routing', default=None)
+
+
+def _track_writes(execute, sql, params, many, context):
+    """
+    Execute wrapper on the primary connection flagging data-changing statements.
+    """
+    routing = _request_routing.get()
+    if routing is not None and sql.lstrip()[:7].upper().startswith(WRITE_STATEMENTS):
+        routing.wrote = True
+    return execute(sql, params, many, context)
+
+
+def _watch_primary_writes():
+    # Connections are per thread; install on the one this thread will use
+    wrappers = connections[PRIMARY].execute_wrappers
+    if _track_writes not in wrappers:
+        wrappers.append(_track_writes)
+
+
+def get_pin_key(request) -> str:
+    """
+    Cache key pinning the requesting client to the primary.
+    """
+    authorization = request.META.get('HTTP_AUTHORIZATION')
+    if authorization:
+        ident = 'auth:' + hashlib.sha256(authorization.encode()).hexdigest()
+    else:
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+        ident = 'ip:' + (forwarded.split(',')[0].strip() or request.META.get('REMOTE_ADDR', ''))
+    return f'{STICKY_COOKIE}:{ident}'
+
+
+class PrimaryReplicaRouter:
+    """
+    DATABASE_ROUTERS entry implementing the routing described above.
+    Does nothing unless a `replica` database is configured.
+    """
+
+    def db_for_read(self, model, **hints):
+        routing = _request_routing.get()
+        if (
+            routing is not None
+            and routing.replica_reads
+            and not routing.wrote
+            and REPLICA in settings.DATABASES
+            and model._meta.label_lower in REPLICA_READ_MODELS
+        ):
+            return REPLICA
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        if _request_routing.get() is not None:
+            _watch_primary_writes()
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        if {obj1._state.db, obj2._state.db} <= {PRIMARY, REPLICA}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica follows the primary's schema through replication
+        if db == REPLICA:
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Enables replica reads for safe requests of clients that haven't written
+    recently, and pins clients to the primary after they write. Runs
+    natively in both sync and async stacks.
+    """
+    sync_capable = True
+    async_capable = True
+
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def _may_use_replica(self, request) -> bool:
+        return (
+            REPLICA in settings.DATABASES
+            and request.method in self.SAFE_METHODS
+            and STICKY_COOKIE not in request.COOKIES
+        )
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        replica_reads = self._may_use_replica(request) and not cache.get(get_pin_key(request))
+        routing = RequestRouting(replica_reads)
+        token = _request_routing.set(routing)
+        try:
+            _watch_primary_writes()
+            response = self.get_response(request)
+        finally:
+            _request_routing.reset(token)
+
+        if self._should_pin(request, routing):
+            cache.set(get_pin_key(request), 1, settings.DB_REPLICA_STICKY_SECONDS)
+            self._set_cookie(response)
+        return response
+
+    async def __acall__(self, request):
+        replica_reads = self._may_use_replica(request) and not await cache.aget(get_pin_key(request))
+        routing = RequestRouting(replica_reads)
+        token = _request_routing.set(routing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_routing.reset(token)
+
+        if self._should_pin(request, routing):
+            await cache.aset(get_pin_key(request), 1, settings.DB_REPLICA_STICKY_SECONDS)
+            self._set_cookie(response)
+        return response
+
+    def _should_pin(self, request, routing) -> bool:
+        return REPLICA in settings.DATABASES and (routing.wrote or request.method not in self.SAFE_METHODS)
+
+    def _set_cookie(self, response):
+        response.set_cookie(
+            STICKY_COOKIE, '1',
+            max_age=settings.DB_REPLICA_STICKY_SECONDS,
+            httponly=True,
+            samesite='Lax'
+        )
@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import sys
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -69,14 +71,30 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # CORS middleware - must be near the top
+    'core.db_routing.ReplicaRoutingMiddleware',  # Replica reads + read-your-writes pinning
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.ProfilingMiddleware',  # No-op unless PROFILING_ENABLED
 ]
 
+# Request profiling (api.middleware.ProfilingMiddleware): Server-Timing and
+# query-count headers, N+1 warnings and sampled cProfile dumps of slow requests
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'False') == 'True'
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', '0.1'))
+PROFILING_SLOW_REQUEST_MS = float(os.getenv('PROFILING_SLOW_REQUEST_MS', '500'))
+PROFILING_REPEATED_QUERY_THRESHOLD = int(os.getenv('PROFILING_REPEATED_QUERY_THRESHOLD', '5'))
+PROFILING_DUMP_DIR = os.getenv('PROFILING_DUMP_DIR', os.path.join(tempfile.gettempdir(), 'ecom_profiles'))
+
+# Large-table admin changelists (api.admin_utils): unfiltered lists show the
+# database's row estimate above this many rows, filtered lists count exactly
+# up to ADMIN_EXACT_COUNT_LIMIT rows
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.getenv('ADMIN_ESTIMATED_COUNT_THRESHOLD', '100000'))
+ADMIN_EXACT_COUNT_LIMIT = int(os.getenv('ADMIN_EXACT_COUNT_LIMIT', '10000'))
+
 ROOT_URLCONF = 'core.urls'
 
 TEMPLATES = [
@@ -100,16 +118,51 @@ WSGI_APPLICATION = 'core.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.mysql",
-        "NAME": os.getenv('DB_NAME', 'ecom_db'),
-        "USER": os.getenv('DB_USER', 'root'),
-        "PASSWORD": os.getenv('DB_PASSWORD', ''),
-        "HOST": os.getenv('DB_HOST', '127.0.0.1'),
-        "PORT": os.getenv('DB_PORT', '3306'),
+# DB_ENGINE=sqlite runs against a local SQLite file instead of MySQL (handy for
+# benchmarks and quick local checks)
+if os.getenv('DB_ENGINE', 'mysql') == 'sqlite':
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.getenv('DB_NAME', str(BASE_DIR / 'db.sqlite3')),
+        }
+    }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.mysql",
+            "NAME": os.getenv('DB_NAME', 'ecom_db'),
+            "USER": os.getenv('DB_USER', 'root'),
+            "PASSWORD": os.getenv('DB_PASSWORD', ''),
+            "HOST": os.getenv('DB_HOST', '127.0.0.1'),
+            "PORT": os.getenv('DB_PORT', '3306'),
+        }
     }
-}
+
+# Persistent connections: reuse each connection for up to DB_CONN_MAX_AGE
+# seconds instead of reconnecting on every request, checking it is still
+# alive before reuse. WSGI and worker processes only: core/asgi.py defaults
+# DB_CONN_MAX_AGE to 0.
+for database in DATABASES.values():
+    database["CONN_MAX_AGE"] = int(os.getenv('DB_CONN_MAX_AGE', '60'))
+    database["CONN_HEALTH_CHECKS"] = True
+
+# Optional read replica (DB_REPLICA_HOST for MySQL, DB_REPLICA_NAME for a
+# second SQLite file). Product reads of GET requests go there, see
+# core/db_routing.py. Tests mirror it to the primary.
+if os.getenv('DB_REPLICA_HOST') or os.getenv('DB_REPLICA_NAME'):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": os.getenv('DB_REPLICA_HOST', DATABASES["default"].get("HOST", "")),
+        "PORT": os.getenv('DB_REPLICA_PORT', DATABASES["default"].get("PORT", "")),
+        "NAME": os.getenv('DB_REPLICA_NAME', DATABASES["default"]["NAME"]),
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ['core.db_routing.PrimaryReplicaRouter']
+
+# Seconds a client keeps reading from the primary after a write
+DB_REPLICA_STICKY_SECONDS = int(os.getenv('DB_REPLICA_STICKY_SECONDS', '5'))
 
 
 
@@ -152,7 +205,7 @@ STATIC_URL = 'static/'
 # Django REST Framework + JWT
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.authentication.CachedJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
         "rest_framework.authentication.BasicAuthentication",
     ],
@@ -164,6 +217,13 @@ REST_FRAMEWORK = {
         "rest_framework.parsers.FormParser",
         "rest_framework.parsers.MultiPartParser",
     ],
+    # Throttle scopes (counters are kept in the shared default cache)
+    "DEFAULT_THROTTLE_RATES": {
+        "auth_login": os.getenv('THROTTLE_AUTH_LOGIN', '10/min'),
+        "auth_register": os.getenv('THROTTLE_AUTH_REGISTER', '5/min'),
+        "auth_burst": os.getenv('THROTTLE_AUTH_BURST', '120/min'),
+        "scrape": os.getenv('THROTTLE_SCRAPE', '10/min'),
+    },
 }
 
 
@@ -175,6 +235,11 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
+# Users resolved from JWTs are cached in-process (api.authentication) for this
+# many seconds; saving or deleting a user drops its entry
+JWT_USER_CACHE_TTL = float(os.getenv('JWT_USER_CACHE_TTL', '30'))
+JWT_USER_CACHE_SIZE = int(os.getenv('JWT_USER_CACHE_SIZE', '1024'))
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -182,6 +247,34 @@ SIMPLE_JWT = {
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Must be shared between the web and qcluster processes (job change
+# notifications go through it), so the per-process local-memory cache won't do.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        "LOCATION": os.getenv('CACHE_LOCATION', os.path.join(tempfile.gettempdir(), 'ecom_cache')),
+    },
+    # Job revisions for the event streams (api.job_events). Kept apart from the
+    # default cache so throttle keys can't push them out, and never culled: a
+    # stream whose revision disappears has to fall back to the database.
+    # Finished jobs delete their key, so only active jobs take up entries.
+    "job_events": {
+        "BACKEND": os.getenv('JOB_EVENTS_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        "LOCATION": os.getenv('JOB_EVENTS_CACHE_LOCATION', os.path.join(tempfile.gettempdir(), 'ecom_job_events')),
+        "OPTIONS": {"MAX_ENTRIES": sys.maxsize},
+    },
+}
+
+
+# Job progress events (Server-Sent Events)
+# Seconds between revision checks for all open streams of a process
+JOB_EVENTS_POLL_INTERVAL = float(os.getenv('JOB_EVENTS_POLL_INTERVAL', '0.5'))
+# Seconds of inactivity before a keep-alive comment is sent
+JOB_EVENTS_HEARTBEAT = float(os.getenv('JOB_EVENTS_HEARTBEAT', '15'))
+
+
 # Django-Q Configuration
 # https://django-q.readthedocs.io/en/latest/configure.html
 Q_CLUSTER = {
@@ -195,6 +288,58 @@ Q_CLUSTER = {
     'orm': 'default',  # Use Django's default database
 }
 
+# New scrape jobs are refused (429 + Retry-After) while this many tasks are
+# already waiting in the Django-Q broker
+SCRAPE_ADMISSION_QUEUE_LIMIT = int(os.getenv('SCRAPE_ADMISSION_QUEUE_LIMIT', str(Q_CLUSTER['queue_limit'])))
+
+# Long crawls are checkpointed after every page: a task killed on 'timeout'
+# is retried by Django-Q after 'retry' seconds and resumes from the checkpoint.
+# Running jobs without a heartbeat for JOB_STALE_SECONDS are requeued by
+# api.tasks.reap_stale_jobs, up to JOB_MAX_ATTEMPTS attempts per job.
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '5'))
+JOB_STALE_SECONDS = int(os.getenv('JOB_STALE_SECONDS', '300'))
+
+# The qcluster process loads Selenium and resolves the ChromeDriver path once at
+# startup, so forked and recycled workers start their first job warm.
+# CHROMEDRIVER_PATH skips webdriver-manager's network version check entirely.
+SCRAPER_WARMUP = os.getenv('SCRAPER_WARMUP', 'True') == 'True'
+CHROMEDRIVER_PATH = os.getenv('CHROMEDRIVER_PATH', '')
+
+# Adaptive periodic syncs (api.scheduler): each source's interval doubles when
+# at most SYNC_BACKOFF_BELOW of its products changed over the last
+# SYNC_CHANGE_HISTORY runs and halves when at least SYNC_TIGHTEN_ABOVE changed
+SYNC_INITIAL_INTERVAL_MINUTES = int(os.getenv('SYNC_INITIAL_INTERVAL_MINUTES', '60'))
+SYNC_MIN_INTERVAL_MINUTES = int(os.getenv('SYNC_MIN_INTERVAL_MINUTES', '15'))
+SYNC_MAX_INTERVAL_MINUTES = int(os.getenv('SYNC_MAX_INTERVAL_MINUTES', str(24 * 60)))
+SYNC_CHANGE_HISTORY = int(os.getenv('SYNC_CHANGE_HISTORY', '5'))
+SYNC_BACKOFF_BELOW = float(os.getenv('SYNC_BACKOFF_BELOW', '0.02'))
+SYNC_TIGHTEN_ABOVE = float(os.getenv('SYNC_TIGHTEN_ABOVE', '0.2'))
+
+# Retention for finished AutomationJob rows and Django-Q task results
+# (pruned daily by api.tasks.prune_old_jobs, see `manage.py setup_schedules`)
+JOB_RETENTION_DAYS = int(os.getenv('JOB_RETENTION_DAYS', '30'))
+JOB_RETENTION_BATCH_SIZE = int(os.getenv('JOB_RETENTION_BATCH_SIZE', '1000'))
+
+# Product change feed (GET /api/products/changes): entries are pruned daily
+# with the jobs after PRODUCT_CHANGES_RETENTION_DAYS
+PRODUCT_CHANGES_RETENTION_DAYS = int(os.getenv('PRODUCT_CHANGES_RETENTION_DAYS', '30'))
+
+# Local product image cache (automation.images): after each sync commits, the
+# images of new products and changed image_urls are downloaded by
+# api.tasks.cache_product_images tasks, stored by content hash and served
+# (plus thumbnails, with Pillow installed) from /api/images/<hash>/
+IMAGE_CACHE_ENABLED = os.getenv('IMAGE_CACHE_ENABLED', 'True') == 'True'
+IMAGE_CACHE_DIR = os.getenv('IMAGE_CACHE_DIR', str(BASE_DIR / 'image_cache'))
+IMAGE_DOWNLOAD_CONCURRENCY = int(os.getenv('IMAGE_DOWNLOAD_CONCURRENCY', '8'))
+IMAGE_DOWNLOAD_TIMEOUT = float(os.getenv('IMAGE_DOWNLOAD_TIMEOUT', '10'))
+IMAGE_MAX_BYTES = int(os.getenv('IMAGE_MAX_BYTES', str(5 * 1024 * 1024)))
+IMAGE_THUMBNAIL_SIZE = int(os.getenv('IMAGE_THUMBNAIL_SIZE', '200'))
+# Products per download task: batches of IMAGE_DOWNLOAD_CONCURRENCY parallel
+# downloads, each up to IMAGE_DOWNLOAD_TIMEOUT, must fit in Q_CLUSTER['timeout']
+IMAGE_TASK_BATCH_SIZE = int(os.getenv('IMAGE_TASK_BATCH_SIZE', '32'))
+# Cached images never change (their URL is their hash), let clients keep them
+IMAGE_CACHE_MAX_AGE = int(os.getenv('IMAGE_CACHE_MAX_AGE', str(365 * 24 * 3600)))
+
 
 # ============================================================================
 # CORS Configuration Notes